@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Email HTML Pre-flight
+
+Optional stage run on broadcast HTML before it is sent to Kit:
+  - strips comments (keeping Outlook conditional comments)
+  - collapses indentation and whitespace (except inside <pre>/<textarea>)
+    and minifies <style> blocks
+  - drops repeated declarations inside each inline style attribute
+  - flags embedded (data: URI) images over a size limit
+  - reports the final size against Gmail's clipping threshold (~102KB)
+
+Styles stay inline: many clients still drop <style> blocks, so moving
+shared inline styles into classes would change how the email renders.
+
+Results are cached by content hash under the Kit cache dir, so a dry run
+followed by the real send (or a re-run batch) only processes each email once.
+
+Usage:
+    python email_preflight.py newsletter.html              # Report only
+    python email_preflight.py newsletter.html -o out.html  # Also write the optimized HTML
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from dataclasses import asdict, dataclass, field
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+from instrumentation import count, timed
+from kit_audience import kit_cache_dir
+
+
+GMAIL_CLIP_BYTES = 102 * 1024  # Gmail hides everything past this behind "[Message clipped]"
+CLIP_WARNING_RATIO = 0.9  # warn when this close to the threshold
+MAX_EMBEDDED_IMAGE_BYTES = 32 * 1024
+PREFLIGHT_VERSION = 1  # bump when the output changes, to invalidate cached results
+
+# Content kept verbatim by the minifier
+RAW_TAGS = {"pre", "textarea", "script"}
+# Whitespace next to these tags never renders, so it can be dropped entirely
+BLOCK_TAGS = {
+    "html", "head", "body", "meta", "title", "link", "style", "table", "thead", "tbody", "tfoot",
+    "tr", "td", "th", "div", "p", "ul", "ol", "li", "h1", "h2", "h3", "h4", "h5", "h6",
+    "center", "br", "hr", "blockquote"
+}
+VOID_TAGS = {"area", "base", "br", "col", "hr", "img", "input", "link", "meta", "source", "wbr"}
+
+DATA_URI = re.compile(r"data:image/[\w.+-]+;base64,([A-Za-z0-9+/=\s]+)")
+CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+CSS_PUNCTUATION = re.compile(r"\s*([{};,>])\s*|(:)\s+")  # no space before ":" ("a :hover" is a descendant)
+WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class PreflightReport:
+    """The optimized HTML and what pre-flight found."""
+    html: str
+    original_bytes: int
+    final_bytes: int
+    comments_removed: int = 0
+    declarations_removed: int = 0
+    # (where, decoded bytes) for each embedded image over the limit
+    oversized_images: List[Tuple[str, int]] = field(default_factory=list)
+    cached: bool = False
+
+    @property
+    def clipped(self) -> bool:
+        """Whether Gmail will clip the email."""
+        return self.final_bytes > GMAIL_CLIP_BYTES
+
+    def warnings(self) -> List[str]:
+        messages = []
+        if self.clipped:
+            messages.append(f"{self.final_bytes:,} bytes is over Gmail's {GMAIL_CLIP_BYTES:,}-byte clipping "
+                            "threshold; the end of the email will be hidden")
+        elif self.final_bytes > GMAIL_CLIP_BYTES * CLIP_WARNING_RATIO:
+            messages.append(f"{self.final_bytes:,} bytes is within {1 - CLIP_WARNING_RATIO:.0%} of Gmail's "
+                            f"{GMAIL_CLIP_BYTES:,}-byte clipping threshold (Kit's template adds more)")
+        for where, size in self.oversized_images:
+            messages.append(f"Embedded image in {where} is {size:,} bytes; host it and link to it instead")
+        return messages
+
+
+def split_declarations(style: str) -> List[str]:
+    """Split a style attribute on ";", ignoring semicolons inside url(...) and quotes."""
+    declarations, current, depth, quote = [], [], 0, None
+    for char in style:
+        if quote:
+            quote = None if char == quote else quote
+        elif char in "\"'":
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth = max(0, depth - 1)
+        elif char == ";" and depth == 0:
+            declarations.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    declarations.append("".join(current))
+    return declarations
+
+
+def dedupe_style(style: str) -> Tuple[str, int]:
+    """
+    Normalize an inline style and drop exact repeats of a declaration.
+
+    Only identical name/value pairs are merged (keeping the last one), since
+    email CSS often repeats a property on purpose as a fallback
+    ("background:#fff;background:rgba(...)").
+
+    Returns:
+        (style, number of declarations removed)
+    """
+    declarations = []
+    for declaration in split_declarations(style):
+        name, sep, value = declaration.partition(":")
+        if not sep or not name.strip():
+            continue
+        declarations.append(f"{name.strip().lower()}:{WHITESPACE.sub(' ', value.strip())}")
+
+    kept = []
+    for index, declaration in enumerate(declarations):
+        if declaration not in declarations[index + 1:]:
+            kept.append(declaration)
+    return ";".join(kept), len(declarations) - len(kept)
+
+
+def minify_css(css: str) -> str:
+    """Strip comments and the whitespace around CSS punctuation."""
+    css = CSS_COMMENT.sub("", css)
+    return CSS_PUNCTUATION.sub(lambda match: match.group(1) or match.group(2), WHITESPACE.sub(" ", css)).strip()
+
+
+def is_conditional_comment(data: str) -> bool:
+    """Outlook conditional comments (<!--[if mso]>...<![endif]-->) carry markup and must stay."""
+    data = data.strip()
+    return data.startswith("[if") or data.startswith("<![endif]") or data.endswith("<![endif]")
+
+
+class _Minifier(HTMLParser):
+    """Re-serializes parsed HTML without comments or redundant whitespace."""
+
+    def __init__(self, max_image_bytes: int):
+        super().__init__(convert_charrefs=False)
+        self.max_image_bytes = max_image_bytes
+        self.out: List[str] = []
+        self.comments_removed = 0
+        self.declarations_removed = 0
+        self.oversized_images: List[Tuple[str, int]] = []
+        self._raw_depth = 0
+        self._in_style = False
+        self._pending_space = False
+        self._after_block = True
+
+    def _emit_tag(self, tag: str, markup: str) -> None:
+        if self._pending_space and not self._after_block and tag not in BLOCK_TAGS:
+            self.out.append(" ")
+        self._pending_space = False
+        self._after_block = tag in BLOCK_TAGS
+        self.out.append(markup)
+
+    def _attributes(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> str:
+        parts = []
+        for name, value in attrs:
+            if value is None:
+                parts.append(f" {name}")
+                continue
+            if name == "style":
+                value, removed = dedupe_style(value)
+                self.declarations_removed += removed
+                if not value:
+                    continue
+            self._check_images(tag, name, value)
+            value = value.replace("&", "&amp;").replace('"', "&quot;")
+            parts.append(f' {name}="{value}"')
+        return "".join(parts)
+
+    def _check_images(self, tag: str, name: str, value: str) -> None:
+        for match in DATA_URI.finditer(value):
+            size = len(WHITESPACE.sub("", match.group(1))) * 3 // 4
+            if size > self.max_image_bytes:
+                self.oversized_images.append((f"<{tag} {name}>", size))
+
+    def handle_starttag(self, tag, attrs):
+        self._emit_tag(tag, f"<{tag}{self._attributes(tag, attrs)}>")
+        if tag in RAW_TAGS:
+            self._raw_depth += 1
+        self._in_style = tag == "style"
+
+    def handle_startendtag(self, tag, attrs):
+        self._emit_tag(tag, f"<{tag}{self._attributes(tag, attrs)}/>")
+
+    def handle_endtag(self, tag):
+        if tag in VOID_TAGS:
+            return
+        if tag in RAW_TAGS and self._raw_depth:
+            self._raw_depth -= 1
+        self._in_style = False
+        self._emit_tag(tag, f"</{tag}>")
+
+    def handle_data(self, data):
+        if self._raw_depth:
+            self.out.append(data)
+            return
+        if self._in_style:
+            for match in DATA_URI.finditer(data):
+                self._check_images("style", "block", match.group(0))
+            self.out.append(minify_css(data))
+            return
+        if not data.strip():
+            self._pending_space = self._pending_space or bool(data)
+            return
+
+        text = WHITESPACE.sub(" ", data)
+        if self._pending_space and not self._after_block and not text.startswith(" "):
+            text = " " + text
+        if self._after_block:
+            text = text.lstrip()
+        self._pending_space = text.endswith(" ")
+        self.out.append(text.rstrip() if self._pending_space else text)
+        self._after_block = False
+
+    def _emit_text(self, markup: str) -> None:
+        if self._pending_space and not self._after_block:
+            self.out.append(" ")
+        self._pending_space = False
+        self._after_block = False
+        self.out.append(markup)
+
+    def handle_entityref(self, name):
+        self._emit_text(f"&{name};")
+
+    def handle_charref(self, name):
+        self._emit_text(f"&#{name};")
+
+    def handle_comment(self, data):
+        if is_conditional_comment(data):
+            self.out.append(f"<!--{data}-->")
+        else:
+            self.comments_removed += 1
+
+    def handle_decl(self, decl):
+        self.out.append(f"<!{decl}>")
+
+    def unknown_decl(self, data):
+        # Downlevel-revealed conditionals: <![if !mso]> ... <![endif]>
+        self.out.append(f"<![{data}]>")
+
+    def handle_pi(self, data):
+        self.out.append(f"<?{data}>")
+
+
+@timed("kit.preflight_optimize")
+def optimize_html(html: str, max_image_bytes: int = MAX_EMBEDDED_IMAGE_BYTES) -> PreflightReport:
+    """Run every pre-flight step on an email's HTML, without the cache."""
+    minifier = _Minifier(max_image_bytes)
+    minifier.feed(html)
+    minifier.close()
+    optimized = "".join(minifier.out)
+    return PreflightReport(
+        html=optimized,
+        original_bytes=len(html.encode()),
+        final_bytes=len(optimized.encode()),
+        comments_removed=minifier.comments_removed,
+        declarations_removed=minifier.declarations_removed,
+        oversized_images=minifier.oversized_images
+    )
+
+
+def preflight(html: str, max_image_bytes: int = MAX_EMBEDDED_IMAGE_BYTES,
+              cache_dir: Optional[str] = None) -> PreflightReport:
+    """
+    Optimize an email's HTML, reusing the cached result for identical content.
+
+    Args:
+        html: The email HTML
+        max_image_bytes: Flag embedded images larger than this
+        cache_dir: Where results are cached (default: preflight/ under the Kit cache dir)
+
+    Returns:
+        A PreflightReport; report.cached is True when it came from the cache
+    """
+    key = hashlib.sha256(f"{PREFLIGHT_VERSION}\0{max_image_bytes}\0".encode() + html.encode()).hexdigest()
+    path = os.path.join(cache_dir or os.path.join(kit_cache_dir(), "preflight"), f"{key}.json")
+
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+        data["oversized_images"] = [tuple(image) for image in data["oversized_images"]]
+        count("kit.preflight_cache", result="hit")
+        return PreflightReport(**{**data, "cached": True})
+    except (OSError, ValueError, TypeError, KeyError):
+        pass
+
+    count("kit.preflight_cache", result="miss")
+    report = optimize_html(html, max_image_bytes)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({**asdict(report), "cached": False}, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass  # An unwritable cache only costs a re-run next time
+    return report
+
+
+def format_report(report: PreflightReport) -> str:
+    """Format a pre-flight report for the terminal."""
+    saved = report.original_bytes - report.final_bytes
+    percent = saved / report.original_bytes if report.original_bytes else 0
+    lines = [
+        f"Pre-flight{' (cached)' if report.cached else ''}: {report.original_bytes:,} -> "
+        f"{report.final_bytes:,} bytes (-{percent:.0%}), "
+        f"{report.final_bytes / GMAIL_CLIP_BYTES:.0%} of Gmail's clipping threshold",
+        f"  {report.comments_removed} comments stripped, "
+        f"{report.declarations_removed} repeated style declarations removed"
+    ]
+    lines.extend(f"  WARNING: {message}" for message in report.warnings())
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimize email HTML and check it against Gmail's clipping limit")
+    parser.add_argument("file", help="HTML file ('-' for stdin)")
+    parser.add_argument("-o", "--output", help="Write the optimized HTML here")
+    parser.add_argument("--max-image-kb", type=int, default=MAX_EMBEDDED_IMAGE_BYTES // 1024,
+                        help=f"Flag embedded images over this size (default: {MAX_EMBEDDED_IMAGE_BYTES // 1024})")
+    args = parser.parse_args()
+
+    try:
+        if args.file == "-":
+            html = sys.stdin.read()
+        else:
+            with open(args.file, "r") as f:
+                html = f.read()
+    except OSError as e:
+        print(f"Error reading HTML: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    report = preflight(html, args.max_image_kb * 1024)
+    print(format_report(report))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report.html)
+
+    if report.clipped:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
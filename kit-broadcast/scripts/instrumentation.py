@@ -0,0 +1 @@
+../../shared/instrumentation.py
\ No newline at end of file
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Kit Audience Targeting
+
+Builds a broadcast's subscriber_filter from segment and tag names, combined
+with all/any/none groups. Names resolve to IDs through a local index of the
+account's segments and tags, cached under the user cache dir.
+
+The index is refreshed incrementally: Kit lists segments and tags in
+creation order with cursor pagination, so a lookup miss only fetches the
+pages after the last cursor seen. A full rebuild (which also picks up
+renames and deletions) runs once the index is older than KIT_INDEX_TTL,
+or when a name is still missing after the incremental pass.
+
+Target syntax: "segment:Name", "tag:Name", or a numeric ID ("segment:544062",
+"tag:123"). A bare name or ID means a segment.
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from instrumentation import span
+
+
+KINDS = ("segments", "tags")
+GROUPS = ("all", "any", "none")
+INDEX_TTL = float(os.environ.get("KIT_INDEX_TTL", 24 * 60 * 60))  # seconds between full rebuilds
+
+# Fetches one page of a listing: (kind, after cursor) -> (items, end cursor, has next page)
+PageFetcher = Callable[[str, Optional[str]], Tuple[List[Dict[str, Any]], Optional[str], bool]]
+
+
+def kit_cache_dir() -> str:
+    """$KIT_CACHE_DIR, else kit/ under the user cache dir (XDG)."""
+    return os.environ.get("KIT_CACHE_DIR") or os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "kit"
+    )
+
+
+def default_index_path(api_key: str) -> str:
+    """Index file under kit_cache_dir(), one per API key."""
+    key_hash = hashlib.sha256(api_key.encode()).hexdigest()[:16]
+    return os.path.join(kit_cache_dir(), f"index-{key_hash}.json")
+
+
+def parse_target(target: str) -> Tuple[str, str]:
+    """Split "tag:Name" into ("tags", "Name"); a bare target is a segment."""
+    kind, sep, name = target.partition(":")
+    if sep and kind.strip().lower() in ("segment", "tag"):
+        return kind.strip().lower() + "s", name.strip()
+    return "segments", target.strip()
+
+
+class KitIndex:
+    """Cached name -> ID index of an account's segments and tags."""
+
+    def __init__(self, path: str, fetch_page: PageFetcher, ttl: float = INDEX_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._fetch_page = fetch_page
+        self._data = self._load()
+        self._rebuilt = set()  # kinds fully rebuilt during this run
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        for kind in KINDS:
+            data.setdefault(kind, {"items": {}, "cursor": None, "built_at": 0})
+        return data
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._data, f)
+        os.replace(tmp_path, self.path)
+
+    def sync(self, kind: str, full: bool = False) -> None:
+        """Fetch new entries since the stored cursor, or rebuild the whole listing."""
+        entry = self._data[kind]
+        if full:
+            entry.update(items={}, cursor=None, built_at=time.time())
+            self._rebuilt.add(kind)
+
+        cursor = entry["cursor"]
+        has_next = True
+        with span("kit.index_sync", kind=kind, full=full):
+            while has_next:
+                items, end_cursor, has_next = self._fetch_page(kind, cursor)
+                for item in items:
+                    entry["items"][str(item["id"])] = item.get("name", "")
+                # Keep the cursor of the last item seen, so the next sync resumes after it
+                if items and end_cursor:
+                    cursor = end_cursor
+        entry["cursor"] = cursor
+        self._save()
+
+    def resolve(self, kind: str, name: str) -> int:
+        """
+        Resolve a segment or tag name (case-insensitive) or numeric ID to its ID.
+
+        Raises:
+            ValueError: if no or several entries have the name
+        """
+        if name.isdigit():
+            return int(name)
+
+        entry = self._data[kind]
+        if time.time() - entry["built_at"] >= self.ttl and kind not in self._rebuilt:
+            self.sync(kind, full=True)
+
+        matches = self._lookup(kind, name)
+        if not matches:
+            self.sync(kind)
+            matches = self._lookup(kind, name)
+        if not matches and kind not in self._rebuilt:
+            self.sync(kind, full=True)
+            matches = self._lookup(kind, name)
+
+        label = kind[:-1]
+        if not matches:
+            raise ValueError(f"Unknown {label}: {name!r}")
+        if len(matches) > 1:
+            raise ValueError(f"Ambiguous {label} {name!r}: IDs {', '.join(map(str, matches))}; use an ID")
+        return matches[0]
+
+    def _lookup(self, kind: str, name: str) -> List[int]:
+        wanted = name.casefold()
+        return sorted(int(item_id) for item_id, item_name in self._data[kind]["items"].items()
+                      if item_name.casefold() == wanted)
+
+
+def build_subscriber_filter(audience: Dict[str, List[str]], index: Optional[KitIndex]) -> List[Dict[str, Any]]:
+    """
+    Turn {"all": [...], "any": [...], "none": [...]} targets into Kit's subscriber_filter.
+
+    Numeric targets need no index; names are resolved through it.
+
+    Raises:
+        ValueError: for an unknown group or an unresolvable name
+    """
+    unknown = set(audience) - set(GROUPS)
+    if unknown:
+        raise ValueError(f"Unknown audience group(s): {', '.join(sorted(unknown))} (use all, any, none)")
+
+    subscriber_filter: Dict[str, Any] = {group: None for group in GROUPS}
+    for group in GROUPS:
+        ids_by_kind: Dict[str, List[int]] = {}
+        for target in audience.get(group) or []:
+            kind, name = parse_target(str(target))
+            if not name.isdigit() and index is None:
+                raise ValueError(f"Can't resolve {target!r} without the Kit index")
+            ids = ids_by_kind.setdefault(kind, [])
+            resolved = int(name) if name.isdigit() else index.resolve(kind, name)
+            if resolved not in ids:
+                ids.append(resolved)
+        if ids_by_kind:
+            subscriber_filter[group] = [{"type": kind[:-1], "ids": ids} for kind, ids in ids_by_kind.items()]
+
+    if not any(subscriber_filter.values()):
+        raise ValueError("Audience is empty")
+    return [subscriber_filter]
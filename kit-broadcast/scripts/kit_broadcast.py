@@ -7,30 +7,185 @@ Creates and schedules email broadcasts via the Kit (ConvertKit) API v4.
 Usage:
     python kit_broadcast.py --subject "Subject line" --content "<p>HTML content</p>" --send-at "2026-01-20T10:00:00-06:00"
     python kit_broadcast.py --subject "Subject line" --content "<p>HTML content</p>" --draft  # Creates draft only
+    python kit_broadcast.py --subject "Subject line" --content-file newsletter.html --send-at "..."
+    render_newsletter | python kit_broadcast.py --subject "Subject line" --content-file -  # HTML from stdin
+    python kit_broadcast.py --subject "..." --content-file newsletter.html --preflight  # Minify and size-check first
     python kit_broadcast.py --dry-run --subject "Test" --content "<p>Test</p>" --send-at "2026-01-20T10:00:00-06:00"
+    python kit_broadcast.py --batch quarter.jsonl  # One broadcast per line, submitted concurrently
+    python kit_broadcast.py --subject "..." --content "..." --all "segment:Newsletter" --none "tag:Churned"
 
 Environment:
     KIT_API_KEY: Your Kit API key (required)
+    KIT_DEFAULT_AUDIENCE: Target when no --all/--any/--none is given (default: segment:544062)
+    KIT_COMPRESS_REQUESTS: Set to 1 to gzip large request bodies (off by default)
 """
 
 import argparse
 import json
 import os
 import sys
-from urllib.request import Request, urlopen
-from urllib.error import HTTPError
+import textwrap
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
 
+from api_transport import ApiError, ApiTransport, encode_json_body
+from email_preflight import format_report, preflight as preflight_html
+from instrumentation import timed
+from kit_audience import INDEX_TTL, GROUPS, KitIndex, build_subscriber_filter, default_index_path
 
-CC4M_BROADCAST_SEGMENT_ID = 544062  # "CC4M broadcast audience" segment (CC4M tag, excludes onboarding sequence)
 
+KIT_API_BASE = os.environ.get("KIT_API_BASE", "https://api.kit.com/v4")
+KIT_RATE_LIMIT = 2.0  # requests per second; Kit allows 120 per rolling minute per key
+# Audience when none is given. 544062 is the "CC4M broadcast audience" segment
+# (CC4M tag, excludes onboarding sequence); set KIT_DEFAULT_AUDIENCE to change it
+DEFAULT_AUDIENCE = os.environ.get("KIT_DEFAULT_AUDIENCE", "segment:544062")
+INDEX_PAGE_SIZE = 1000  # Kit's maximum per_page
+# Gzip large bodies (long newsletters with inlined images). Off by default: Kit doesn't
+# document gzip request support, and a server that rejects it may not say so with a 415
+KIT_COMPRESS_REQUESTS = os.environ.get("KIT_COMPRESS_REQUESTS", "0") == "1"
+DRY_RUN_PREVIEW_CHARS = 200  # content shown by --dry-run
 
+BATCH_FIELDS = {"subject", "content", "content_file", "send_at", "preview_text", "description",
+                "segment", "tag", "audience"}
+
+
+@dataclass
+class BroadcastResult:
+    success: bool
+    broadcast_id: Optional[int] = None
+    send_at: Optional[str] = None
+    error: Optional[str] = None
+
+
+def build_broadcast_payload(
+    subject: str,
+    content: str,
+    send_at: str | None = None,
+    preview_text: str | None = None,
+    description: str | None = None,
+    subscriber_filter: List[dict] | None = None
+) -> dict:
+    """Build the JSON body for POST /broadcasts.
+
+    subscriber_filter comes from KitBroadcaster.subscriber_filter(); by
+    default the DEFAULT_AUDIENCE (which must then be numeric) is used.
+    """
+    payload = {
+        "subject": subject,
+        "content": content,
+        "public": False,  # Don't publish to web
+        "subscriber_filter": subscriber_filter or build_subscriber_filter({"all": [DEFAULT_AUDIENCE]}, None)
+    }
+
+    if send_at:
+        payload["send_at"] = send_at
+
+    if preview_text:
+        payload["preview_text"] = preview_text
+
+    if description:
+        payload["description"] = description
+
+    return payload
+
+
+class KitBroadcaster:
+    """Kit broadcast client holding one pooled, rate-limited connection for many calls."""
+
+    def __init__(self, api_key: str, api_base: str = KIT_API_BASE, rate_limit: float = KIT_RATE_LIMIT,
+                 index_ttl: float = INDEX_TTL):
+        self.api_key = api_key
+        self.index_ttl = index_ttl
+        self._index: KitIndex | None = None
+        self._transport = ApiTransport(api_base, headers={"X-Kit-Api-Key": api_key}, rate_limit=rate_limit,
+                                       compress_requests=KIT_COMPRESS_REQUESTS)
+
+    def __enter__(self) -> "KitBroadcaster":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the pooled connections to the Kit API."""
+        self._transport.close()
+
+    @property
+    def index(self) -> KitIndex:
+        """The cached segment/tag index, loaded on first use."""
+        if self._index is None:
+            self._index = KitIndex(default_index_path(self.api_key), self._fetch_page, self.index_ttl)
+        return self._index
+
+    def _fetch_page(self, kind: str, cursor: str | None) -> tuple:
+        """Fetch one page of /segments or /tags for the index."""
+        query = f"/{kind}?per_page={INDEX_PAGE_SIZE}" + (f"&after={cursor}" if cursor else "")
+        response = self._transport.request_json("GET", query)
+        pagination = response.get("pagination") or {}
+        return response.get(kind, []), pagination.get("end_cursor"), bool(pagination.get("has_next_page"))
+
+    def subscriber_filter(self, audience: Dict[str, List[str]] | None = None) -> List[dict]:
+        """
+        Resolve {"all": [...], "any": [...], "none": [...]} segment/tag targets to a subscriber_filter.
+
+        Raises:
+            ValueError: if a name is unknown or ambiguous
+        """
+        return build_subscriber_filter(audience or {"all": [DEFAULT_AUDIENCE]}, self.index)
+
+    def create(self, payload: dict) -> dict:
+        """Create one broadcast from a payload.
+
+        Raises:
+            ApiError: if Kit rejects the request (429s are retried; server errors are not, see ApiTransport)
+        """
+        # The transport gives each call its own Idempotency-Key, reused only for retries of
+        # that call, so sending the same content again on purpose creates a second broadcast
+        return self._transport.request_json("POST", "/broadcasts", payload)
+
+    @timed("kit.create_many")
+    def create_many(self, payloads: List[dict], max_concurrency: int = 4) -> List[BroadcastResult]:
+        """
+        Create many broadcasts concurrently, reporting each failure instead of raising.
+
+        Args:
+            payloads: Payloads from build_broadcast_payload()
+            max_concurrency: Maximum number of requests in flight at once
+
+        Returns:
+            One BroadcastResult per payload, in input order
+        """
+        if max_concurrency <= 1 or len(payloads) <= 1:
+            return [self._create_result(payload) for payload in payloads]
+
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(payloads))) as executor:
+            return list(executor.map(self._create_result, payloads))
+
+    def _create_result(self, payload: dict) -> BroadcastResult:
+        try:
+            response = self.create(payload)
+        except ApiError as e:
+            return BroadcastResult(success=False, error=f"{e.status}: {e.message}")
+        except Exception as e:
+            return BroadcastResult(success=False, error=str(e))
+
+        broadcast = response.get("broadcast", response)
+        return BroadcastResult(success=True, broadcast_id=broadcast.get("id"),
+                               send_at=broadcast.get("send_at"))
+
+
+@timed("kit.create_broadcast")
 def create_broadcast(
     subject: str,
     content: str,
     send_at: str | None = None,
     preview_text: str | None = None,
     description: str | None = None,
-    dry_run: bool = False
+    dry_run: bool = False,
+    audience: Dict[str, List[str]] | None = None,
+    refresh_index: bool = False,
+    preflight: bool = False
 ) -> dict:
     """Create a broadcast in Kit.
 
@@ -40,80 +195,285 @@ def create_broadcast(
         send_at: ISO8601 timestamp for scheduled send (None = draft)
         preview_text: Preview text shown in email clients
         description: Internal description of the broadcast
-        dry_run: If True, print request but don't send
+        dry_run: If True, print a summary of the request (content truncated) but don't send
+        audience: Segment/tag targets by group, e.g. {"all": ["segment:Newsletter"], "none": ["tag:Churned"]}
+            (default: DEFAULT_AUDIENCE)
+        refresh_index: Rebuild the cached segment/tag index before resolving names
+        preflight: Minify the HTML and report its size against Gmail's clipping limit first
 
     Returns:
         API response as dict
+
+    Raises:
+        ApiError: if Kit rejects the request (429s are retried; server errors are not, see ApiTransport)
+        ValueError: if an audience name is unknown or ambiguous
     """
+    api_key = get_api_key_or_exit()
+
+    if preflight:
+        report = preflight_html(content)
+        print(format_report(report))
+        content = report.html
+
+    with KitBroadcaster(api_key, index_ttl=0 if refresh_index else INDEX_TTL) as broadcaster:
+        payload = build_broadcast_payload(subject, content, send_at, preview_text, description,
+                                          broadcaster.subscriber_filter(audience))
+
+        if dry_run:
+            print("=== DRY RUN ===")
+            print(f"URL: POST {KIT_API_BASE}/broadcasts")
+            print(f"Headers: X-Kit-Api-Key: {api_key[:10]}...")
+            print(f"Body: {describe_body_size(payload)}")
+            return {"dry_run": True, "payload": summarize_payload(payload)}
+
+        return broadcaster.create(payload)
+
+
+def summarize_payload(payload: dict, preview_chars: int = DRY_RUN_PREVIEW_CHARS) -> dict:
+    """Copy of a payload with the HTML content cut down to a short preview and its size."""
+    content = payload["content"]
+    summary = dict(payload)
+    if len(content) > preview_chars:
+        summary["content"] = (f"{content[:preview_chars]}... "
+                              f"[{len(content.encode()):,} bytes total]")
+    return summary
+
+
+def describe_body_size(payload: dict) -> str:
+    """Request body size as sent, e.g. "1,204,112 bytes JSON, 311,870 gzipped"."""
+    size = len(encode_json_body(payload))
+    if not KIT_COMPRESS_REQUESTS:
+        return f"{size:,} bytes JSON"
+    return f"{size:,} bytes JSON, {len(encode_json_body(payload, compress=True)):,} gzipped"
+
+
+def read_content(path: str) -> str:
+    """Read email HTML from a file, or from stdin when path is "-"."""
+    if path == "-":
+        return sys.stdin.read()
+    with open(path, "r") as f:
+        return f.read()
+
+
+def get_api_key_or_exit() -> str:
+    """Get KIT_API_KEY or exit with an error."""
     api_key = os.environ.get("KIT_API_KEY")
     if not api_key:
         print("Error: KIT_API_KEY environment variable not set", file=sys.stderr)
         sys.exit(1)
+    return api_key
 
-    url = "https://api.kit.com/v4/broadcasts"
 
-    payload = {
-        "subject": subject,
-        "content": content,
-        "public": False,  # Don't publish to web
-        "subscriber_filter": [
-            {"all": [{"type": "segment", "ids": [CC4M_BROADCAST_SEGMENT_ID]}], "any": None, "none": None}
-        ]
-    }
+def load_batch(path: str) -> List[Dict[str, Any]]:
+    """Load broadcasts from a JSONL (one object per line) or JSON array file.
 
-    if send_at:
-        payload["send_at"] = send_at
+    Each entry needs a subject and either inline "content" or a "content_file"
+    path relative to the batch file; send_at, preview_text, description and
+    targeting are optional. Target with "segment" or "tag" (a name or ID,
+    added to the "all" group) and/or "audience" ({"all"|"any"|"none": [...]}).
+    """
+    with open(path, "r") as f:
+        text = f.read()
 
-    if preview_text:
-        payload["preview_text"] = preview_text
+    if text.lstrip().startswith("["):
+        entries = json.loads(text)
+    else:
+        entries = [json.loads(line) for line in text.splitlines()
+                   if line.strip() and not line.lstrip().startswith("#")]
 
-    if description:
-        payload["description"] = description
+    base_dir = os.path.dirname(os.path.abspath(path))
+    for number, entry in enumerate(entries, 1):
+        if not isinstance(entry, dict):
+            raise ValueError(f"Entry {number}: expected an object")
+        unknown = set(entry) - BATCH_FIELDS
+        if unknown:
+            raise ValueError(f"Entry {number}: unknown fields {', '.join(sorted(unknown))}")
+        if "content_file" in entry and "content" not in entry:
+            with open(os.path.join(base_dir, entry["content_file"]), "r") as f:
+                entry["content"] = f.read()
+        if not entry.get("subject") or not entry.get("content"):
+            raise ValueError(f"Entry {number}: needs 'subject' and 'content' or 'content_file'")
 
-    if dry_run:
-        print("=== DRY RUN ===")
-        print(f"URL: POST {url}")
-        print(f"Headers: X-Kit-Api-Key: {api_key[:10]}...")
-        print(f"Payload:\n{json.dumps(payload, indent=2)}")
-        return {"dry_run": True, "payload": payload}
+    return entries
 
-    headers = {
-        "Content-Type": "application/json",
-        "X-Kit-Api-Key": api_key
-    }
 
-    data = json.dumps(payload).encode("utf-8")
-    req = Request(url, data=data, headers=headers, method="POST")
+def entry_audience(entry: Dict[str, Any], default: Dict[str, List[str]] | None) -> Dict[str, List[str]] | None:
+    """The audience for a batch entry: its own targeting, else the command-line default."""
+    audience = {group: list(targets) for group, targets in (entry.get("audience") or {}).items()}
+    if entry.get("segment"):
+        audience.setdefault("all", []).append(f"segment:{entry['segment']}")
+    if entry.get("tag"):
+        audience.setdefault("all", []).append(f"tag:{entry['tag']}")
+    return audience or default
+
+
+def batch_payload(entry: Dict[str, Any], broadcaster: KitBroadcaster,
+                  default_audience: Dict[str, List[str]] | None = None) -> dict:
+    """Build the broadcast payload for one batch entry, resolving its audience."""
+    return build_broadcast_payload(
+        entry["subject"],
+        entry["content"],
+        send_at=entry.get("send_at"),
+        preview_text=entry.get("preview_text"),
+        description=entry.get("description"),
+        subscriber_filter=broadcaster.subscriber_filter(entry_audience(entry, default_audience))
+    )
+
+
+def describe_filter(subscriber_filter: List[dict]) -> str:
+    """Summarize a subscriber_filter, e.g. "all segment 544062; none tag 12"."""
+    parts = []
+    for group in GROUPS:
+        for condition in subscriber_filter[0].get(group) or []:
+            parts.append(f"{group} {condition['type']} {','.join(map(str, condition['ids']))}")
+    return "; ".join(parts)
+
+
+def format_batch_summary(entries: List[Dict[str, Any]], results: List[BroadcastResult]) -> str:
+    """Format a per-broadcast summary table for a batch run."""
+    lines = [f"{'#':>3}  {'Result':<8} {'Broadcast':<10} {'Send at':<26} Subject / Error"]
+
+    for number, (entry, result) in enumerate(zip(entries, results), 1):
+        if result.success:
+            lines.append(f"{number:>3}  {'ok':<8} {str(result.broadcast_id or '-'):<10} "
+                         f"{result.send_at or entry.get('send_at') or 'draft':<26} {entry['subject'][:50]}")
+        else:
+            lines.append(f"{number:>3}  {'FAILED':<8} {'-':<10} {entry.get('send_at') or '-':<26} "
+                         f"{entry['subject'][:30]}: {result.error}")
+
+    succeeded = sum(1 for result in results if result.success)
+    lines.append("")
+    lines.append(f"{succeeded} succeeded, {len(results) - succeeded} failed")
+    return "\n".join(lines)
+
 
+def run_batch(args: argparse.Namespace, audience: Dict[str, List[str]] | None) -> None:
+    """Create every broadcast in a batch file over one connection pool."""
     try:
-        with urlopen(req) as response:
-            result = json.loads(response.read().decode("utf-8"))
-            return result
-    except HTTPError as e:
-        error_body = e.read().decode("utf-8")
-        print(f"Error {e.code}: {error_body}", file=sys.stderr)
+        entries = load_batch(args.batch)
+    except FileNotFoundError as e:
+        print(f"Error: File not found: {e.filename}", file=sys.stderr)
+        sys.exit(1)
+    except (ValueError, TypeError, OSError) as e:
+        print(f"Error reading batch: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if not entries:
+        print("Error: Batch file is empty", file=sys.stderr)
+        sys.exit(1)
+
+    if args.preflight:
+        for number, entry in enumerate(entries, 1):
+            report = preflight_html(entry["content"])
+            print(f"{number:>3}  {entry['subject'][:60]}")
+            print(textwrap.indent(format_report(report), "     "))
+            entry["content"] = report.html
+        print()
+
+    api_key = get_api_key_or_exit()
+    with KitBroadcaster(api_key, index_ttl=0 if args.refresh_index else INDEX_TTL) as broadcaster:
+        # Resolve every audience up front; an unknown name fails only its own entry
+        payloads: List[dict | None] = []
+        results: List[BroadcastResult | None] = []
+        for entry in entries:
+            try:
+                payloads.append(batch_payload(entry, broadcaster, audience))
+                results.append(None)
+            except ValueError as e:
+                payloads.append(None)
+                results.append(BroadcastResult(success=False, error=str(e)))
+            except ApiError as e:
+                payloads.append(None)
+                results.append(BroadcastResult(success=False, error=f"looking up audience: {e.status}: {e.message}"))
+
+        if args.dry_run:
+            print(f"=== DRY RUN: {len(entries)} broadcasts ===")
+            for number, (entry, payload) in enumerate(zip(entries, payloads), 1):
+                target = describe_filter(payload["subscriber_filter"]) if payload else f"ERROR: {results[number - 1].error}"
+                print(f"{number:>3}  {entry.get('send_at') or 'draft':<26} {entry['subject'][:40]:<40}  {target}")
+            if None in payloads:
+                sys.exit(1)
+            return
+
+        pending = [i for i, payload in enumerate(payloads) if payload is not None]
+        print(f"Creating {len(pending)} broadcasts (concurrency {args.concurrency})...")
+        print()
+
+        created = broadcaster.create_many([payloads[i] for i in pending], args.concurrency)
+        for i, result in zip(pending, created):
+            results[i] = result
+
+    print(format_batch_summary(entries, results))
+
+    if not all(result.success for result in results):
         sys.exit(1)
 
 
 def main():
     parser = argparse.ArgumentParser(description="Create Kit email broadcasts")
-    parser.add_argument("--subject", required=True, help="Email subject line")
-    parser.add_argument("--content", required=True, help="HTML content of the email")
+    parser.add_argument("--subject", help="Email subject line")
+    parser.add_argument("--content", help="HTML content of the email")
+    parser.add_argument("--content-file", metavar="PATH",
+                        help="Read the HTML content from a file ('-' for stdin) instead of --content")
     parser.add_argument("--send-at", help="ISO8601 timestamp to schedule (omit for draft)")
     parser.add_argument("--preview-text", help="Preview text for email clients")
     parser.add_argument("--description", help="Internal description")
     parser.add_argument("--dry-run", action="store_true", help="Print request without sending")
+    parser.add_argument("--preflight", action="store_true",
+                        help="Minify the HTML, flag large embedded images and check the size against "
+                             "Gmail's ~102KB clipping limit before sending")
+    parser.add_argument("--all", action="append", metavar="TARGET",
+                        help="Send to subscribers in every one of these: 'segment:NAME', 'tag:NAME' "
+                             "or an ID (repeatable)")
+    parser.add_argument("--any", action="append", metavar="TARGET",
+                        help="Send to subscribers in at least one of these (repeatable)")
+    parser.add_argument("--none", action="append", metavar="TARGET",
+                        help="Exclude subscribers in any of these (repeatable)")
+    parser.add_argument("--refresh-index", action="store_true",
+                        help="Rebuild the cached segment/tag name index before resolving names")
+    parser.add_argument("--batch",
+                        help="JSONL or JSON file of broadcasts (subject, content or content_file, "
+                             "send_at, preview_text, description, segment, tag, audience) to create in one run")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Maximum concurrent requests in --batch mode (default: 4)")
 
     args = parser.parse_args()
+    audience = {group: getattr(args, group) for group in GROUPS if getattr(args, group)} or None
 
-    result = create_broadcast(
-        subject=args.subject,
-        content=args.content,
-        send_at=args.send_at,
-        preview_text=args.preview_text,
-        description=args.description,
-        dry_run=args.dry_run
-    )
+    if args.batch:
+        run_batch(args, audience)
+        return
+
+    if args.content is not None and args.content_file:
+        parser.error("use either --content or --content-file, not both")
+    if args.content_file:
+        try:
+            args.content = read_content(args.content_file)
+        except OSError as e:
+            print(f"Error reading content: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    if not args.subject or not args.content:
+        parser.error("--subject and --content or --content-file are required (or use --batch)")
+
+    try:
+        result = create_broadcast(
+            subject=args.subject,
+            content=args.content,
+            send_at=args.send_at,
+            preview_text=args.preview_text,
+            description=args.description,
+            dry_run=args.dry_run,
+            audience=audience,
+            refresh_index=args.refresh_index,
+            preflight=args.preflight
+        )
+    except ApiError as e:
+        print(f"Error {e.status}: {e.body}", file=sys.stderr)
+        sys.exit(1)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
 
     print(json.dumps(result, indent=2))
 
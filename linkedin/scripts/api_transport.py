@@ -0,0 +1 @@
+../../shared/api_transport.py
\ No newline at end of file
@@ -0,0 +1,626 @@
+#!/usr/bin/env python3
+"""
+Shared API Transport
+
+HTTP layer shared by the skill scripts that call external APIs (Typefully,
+Kit). Each skill symlinks this file into its scripts/ directory.
+
+Provides:
+  - Keep-alive connection pooling per API host
+  - Client-side token-bucket rate limiting
+  - Retries with exponential backoff and jitter for 429/5xx responses,
+    honoring Retry-After
+  - Idempotency keys on POST; POSTs are only re-sent after a timeout or
+    5xx when the caller says the endpoint honors the key
+  - Optional gzip request bodies for large payloads, compressed as the
+    JSON is encoded (the body itself is still sent from memory, not streamed)
+  - Optional timing spans per request (DNS, connect, TLS, first byte,
+    total) and for rate-limit waits and retry backoff, via instrumentation
+  - Record/replay of request/response pairs to a cassette file, so any
+    script can run offline against recorded responses
+
+Record or replay by setting API_CASSETTE to a JSONL file path and
+API_CASSETTE_MODE to "record" or "replay" (the default). Replayed responses
+come back instantly unless API_CASSETTE_LATENCY is "recorded" (sleep as
+long as the original call took) or a number of seconds.
+"""
+
+import gzip
+import http.client
+import json
+import os
+import random
+import re
+import socket
+import threading
+import time
+import uuid
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from instrumentation import ENABLED as INSTRUMENTED, count, record_span, span
+
+
+REQUEST_TIMEOUT = 30  # seconds
+COMPRESS_MIN_BYTES = 16 * 1024  # smaller bodies aren't worth gzipping
+# Error text that, in a 400/422 to a gzipped body, means the server rejected the encoding
+ENCODING_REJECTED = re.compile(r"gzip|encod|compress", re.I)
+
+# Errors that mean the connection failed before a response arrived
+NETWORK_ERRORS = (OSError, http.client.HTTPException)
+# Network errors raised before any of the request was sent, so safe to retry for any method
+NOT_SENT_ERRORS = (ConnectionRefusedError, socket.gaierror)
+SAFE_METHODS = ("GET", "HEAD", "PUT", "DELETE", "OPTIONS")
+
+# Path segments that are IDs, collapsed so span labels stay low-cardinality
+ID_SEGMENT = re.compile(r"/(?:\d+|[0-9a-f]{16,}|[0-9a-f-]{36})(?=/|$)")
+
+
+class ApiError(Exception):
+    """An API call failed with an HTTP error status, after any retries."""
+
+    def __init__(self, status: int, message: str, body: str = "",
+                 retry_after: Optional[float] = None):
+        super().__init__(f"API Error ({status}): {message}")
+        self.status = status
+        self.message = message
+        self.body = body
+        self.retry_after = retry_after
+
+
+@dataclass
+class RetryPolicy:
+    """How many times, and how long to wait, before retrying a request."""
+    max_attempts: int = 5
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    retry_statuses: Tuple[int, ...] = (429, 500, 502, 503, 504)
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before the given retry (1-based), with full jitter."""
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        backoff = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, backoff)
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing `rate` requests per second, bursting to `capacity`."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class _TimedConnectionMixin:
+    """Splits connect() into DNS, TCP connect and TLS handshake timings, kept for the first request."""
+
+    phases: Optional[Dict[str, float]] = None
+
+    def connect(self) -> None:
+        phases = {}
+        started = time.perf_counter()
+        addresses = socket.getaddrinfo(self.host, self.port, 0, socket.SOCK_STREAM)
+        phases["dns"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        error: Optional[OSError] = None
+        for family, kind, proto, _, address in addresses:
+            sock = socket.socket(family, kind, proto)
+            try:
+                sock.settimeout(self.timeout)
+                sock.connect(address)
+                break
+            except OSError as e:
+                sock.close()
+                error = e
+        else:
+            raise error or OSError(f"Could not connect to {self.host}")
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        phases["connect"] = time.perf_counter() - started
+        self.sock = sock
+
+        if isinstance(self, http.client.HTTPSConnection):
+            started = time.perf_counter()
+            self.sock = self._context.wrap_socket(sock, server_hostname=self.host)
+            phases["tls"] = time.perf_counter() - started
+        self.phases = phases
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, http.client.HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, http.client.HTTPSConnection):
+    pass
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections to a single host, reused across requests."""
+
+    def __init__(self, base_url: str, max_idle: int = 8, timeout: float = REQUEST_TIMEOUT):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/")
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self._idle: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        if self.scheme == "https":
+            connection_class = _TimedHTTPSConnection if INSTRUMENTED else http.client.HTTPSConnection
+        else:
+            connection_class = _TimedHTTPConnection if INSTRUMENTED else http.client.HTTPConnection
+        return connection_class(self.host, self.port, timeout=self.timeout)
+
+    def request(self, method: str, path: str, body: Optional[bytes],
+                headers: Dict[str, str], replay_safe: bool = False) -> Tuple[int, Dict[str, str], bytes]:
+        """Send a request and return (status, response headers, body bytes).
+
+        If the server has closed a reused keep-alive connection, the request
+        is sent once more on a fresh one: always when the send itself
+        failed (the server can't have seen it), but after the response was
+        due only when replay_safe, since the server may already have acted
+        on it.
+        """
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        reused = conn is not None
+
+        while True:
+            if conn is None:
+                conn = self._new_connection()
+            try:
+                started = time.perf_counter()
+                conn.request(method, self.base_path + path, body=body, headers=headers)
+            except BrokenPipeError:
+                conn.close()
+                if not reused:
+                    raise
+                conn, reused = None, False
+                continue
+            except Exception:
+                conn.close()
+                raise
+
+            try:
+                response = conn.getresponse()
+                first_byte = time.perf_counter()
+                payload = response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if not (reused and replay_safe):
+                    raise
+                # The server closed an idle keep-alive connection; retry once on a fresh one
+                conn, reused = None, False
+                continue
+            except Exception:
+                conn.close()
+                raise
+            break
+
+        if INSTRUMENTED:
+            self._record(conn, method, path, response.status, started, first_byte, len(body or b""), len(payload))
+
+        if response.will_close:
+            conn.close()
+        else:
+            with self._lock:
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+
+        response_headers = {name.lower(): value for name, value in response.getheaders()}
+        return response.status, response_headers, payload
+
+    def _record(self, conn: http.client.HTTPConnection, method: str, path: str, status: int,
+                started: float, first_byte: float, sent: int, received: int) -> None:
+        """Record the phases of one round trip as spans, plus request and byte counters."""
+        finished = time.perf_counter()
+        endpoint = ID_SEGMENT.sub("/{id}", self.base_path + path.split("?", 1)[0])
+        attrs = {"host": self.host, "method": method, "endpoint": endpoint}
+        # Connection setup phases exist only on the request that opened the connection
+        phases, conn.phases = getattr(conn, "phases", None), None
+        for phase, duration in (phases or {}).items():
+            record_span(f"http.{phase}", duration, attrs)
+        record_span("http.first_byte", first_byte - started, attrs)
+        record_span("http.request", finished - started, {**attrs, "status": status})
+        count("http.requests", method=method, status=status)
+        if phases:
+            count("http.connections_opened", host=self.host)
+        count("http.bytes_sent", sent, host=self.host)
+        count("http.bytes_received", received, host=self.host)
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+class CassetteMiss(ApiError):
+    """A replayed request has no recorded response."""
+
+    def __init__(self, method: str, url: str):
+        super().__init__(0, f"No recorded response for {method} {url}")
+
+
+def _decode_body(body: Optional[bytes]) -> Any:
+    """A request body as JSON (gunzipped if needed), for storing and matching."""
+    if not body:
+        return None
+    if body[:2] == b"\x1f\x8b":
+        body = gzip.decompress(body)
+    try:
+        return json.loads(body.decode())
+    except ValueError:
+        return body.decode(errors="replace")
+
+
+class Cassette:
+    """
+    Request/response pairs recorded to a JSONL file, one interaction per line.
+
+    In replay mode a request is answered by the first unused interaction with
+    the same method, URL and body; failing that, by the first unused one for
+    the same method and URL (bodies with timestamps differ between runs).
+    Once those run out, the last match is served again. The URL's port is
+    ignored, so a recording made against a local stand-in replays anywhere.
+    """
+
+    MODES = ("record", "replay")
+
+    def __init__(self, path: str, mode: str = "replay", latency: Optional[str] = None):
+        if mode not in self.MODES:
+            raise ValueError(f"Cassette mode must be one of {', '.join(self.MODES)}, not {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._file = None
+        self._interactions: List[Dict[str, Any]] = []
+        self._by_request: Dict[Tuple[str, str, str], Deque[int]] = {}
+        self._by_endpoint: Dict[Tuple[str, str], Deque[int]] = {}
+        self._last: Dict[Tuple, int] = {}
+        self._used = set()
+
+        if mode == "replay":
+            with open(path, "r") as f:
+                for line in f:
+                    if line.strip():
+                        self._index(json.loads(line))
+        else:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._file = open(path, "w")
+
+    @classmethod
+    def from_env(cls) -> Optional["Cassette"]:
+        """The cassette named by API_CASSETTE, shared by every transport in the process."""
+        path = os.environ.get("API_CASSETTE")
+        if not path:
+            return None
+        with _cassettes_lock:
+            if path not in _cassettes:
+                _cassettes[path] = cls(path, os.environ.get("API_CASSETTE_MODE", "replay"),
+                                       os.environ.get("API_CASSETTE_LATENCY"))
+            return _cassettes[path]
+
+    @staticmethod
+    def _keys(method: str, url: str, body: Any) -> Tuple[Tuple[str, str, str], Tuple[str, str]]:
+        parts = urlsplit(url)
+        endpoint = (method, f"{parts.hostname}{parts.path}{'?' + parts.query if parts.query else ''}")
+        return endpoint + (json.dumps(body, sort_keys=True),), endpoint
+
+    def _index(self, interaction: Dict[str, Any]) -> None:
+        request = interaction["request"]
+        number = len(self._interactions)
+        self._interactions.append(interaction)
+        request_key, endpoint_key = self._keys(request["method"], request["url"], request.get("body"))
+        self._by_request.setdefault(request_key, deque()).append(number)
+        self._by_endpoint.setdefault(endpoint_key, deque()).append(number)
+
+    def record(self, method: str, url: str, body: Optional[bytes], status: int,
+               headers: Dict[str, str], payload: bytes, elapsed: float) -> None:
+        """Append one interaction to the cassette file."""
+        interaction = {
+            "request": {"method": method, "url": url, "body": _decode_body(body)},
+            "response": {"status": status, "headers": headers, "body": payload.decode(errors="replace")},
+            "elapsed": round(elapsed, 4)
+        }
+        line = json.dumps(interaction)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def replay(self, method: str, url: str, body: Optional[bytes]) -> Tuple[int, Dict[str, str], bytes, float]:
+        """
+        Find the recorded response for a request.
+
+        Returns:
+            (status, response headers, body bytes, seconds the original call took)
+
+        Raises:
+            CassetteMiss: if nothing was recorded for this method and URL
+        """
+        keys = self._keys(method, url, _decode_body(body))
+        with self._lock:
+            number = self._take(keys[0]) if keys[0] in self._by_request else None
+            if number is None:
+                number = self._take(keys[1])
+        if number is None:
+            raise CassetteMiss(method, url)
+
+        interaction = self._interactions[number]
+        response = interaction["response"]
+        return (response["status"], response.get("headers") or {},
+                response["body"].encode(), interaction.get("elapsed", 0.0))
+
+    def _take(self, key: Tuple) -> Optional[int]:
+        """The next unused interaction for key, else the last one served for it."""
+        queue = (self._by_request if len(key) == 3 else self._by_endpoint).get(key)
+        while queue:
+            number = queue.popleft()
+            if number not in self._used:
+                self._used.add(number)
+                self._last[key] = number
+                return number
+        return self._last.get(key)
+
+    def delay(self, elapsed: float) -> float:
+        """Seconds to wait before returning a replayed response."""
+        if not self.latency:
+            return 0.0
+        if self.latency == "recorded":
+            return elapsed
+        return float(self.latency)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+_cassettes: Dict[str, Cassette] = {}
+_cassettes_lock = threading.Lock()
+
+
+class RecordingPool:
+    """Wraps a ConnectionPool, writing every response it gets to a cassette."""
+
+    def __init__(self, pool: ConnectionPool, base_url: str, cassette: Cassette):
+        self._pool = pool
+        self.base_url = base_url.rstrip("/")
+        self.cassette = cassette
+
+    def request(self, method: str, path: str, body: Optional[bytes],
+                headers: Dict[str, str], replay_safe: bool = False) -> Tuple[int, Dict[str, str], bytes]:
+        started = time.monotonic()
+        status, response_headers, payload = self._pool.request(method, path, body, headers, replay_safe)
+        self.cassette.record(method, self.base_url + path, body, status, response_headers, payload,
+                             time.monotonic() - started)
+        return status, response_headers, payload
+
+    def close(self) -> None:
+        self._pool.close()
+
+
+class ReplayPool:
+    """Answers requests from a cassette without touching the network."""
+
+    def __init__(self, base_url: str, cassette: Cassette):
+        self.base_url = base_url.rstrip("/")
+        self.cassette = cassette
+
+    def request(self, method: str, path: str, body: Optional[bytes],
+                headers: Dict[str, str], replay_safe: bool = False) -> Tuple[int, Dict[str, str], bytes]:
+        status, response_headers, payload, elapsed = self.cassette.replay(method, self.base_url + path, body)
+        delay = self.cassette.delay(elapsed)
+        if delay:
+            time.sleep(delay)
+        return status, response_headers, payload
+
+    def close(self) -> None:
+        pass
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def encode_json_body(data: Any, compress: bool = False) -> bytes:
+    """Serialize a request body as UTF-8 JSON, gzipped if compress is set.
+
+    When compressing, the JSON is fed to the compressor piece by piece, so
+    the uncompressed body is never held as one string. Either way the
+    result is one bytes object held in memory for the whole call (retries
+    resend it), so the plain body costs as much as json.dumps().
+    """
+    if not compress:
+        return json.dumps(data).encode()
+
+    chunks = (chunk.encode() for chunk in json.JSONEncoder().iterencode(data))
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    parts = [compressor.compress(chunk) for chunk in chunks]
+    parts.append(compressor.flush())
+    return b"".join(parts)
+
+
+class ApiTransport:
+    """JSON-over-HTTPS client with pooling, rate limiting and retries."""
+
+    def __init__(
+        self,
+        base_url: str,
+        headers: Optional[Dict[str, str]] = None,
+        rate_limit: Optional[float] = None,
+        burst: Optional[float] = None,
+        retry: Optional[RetryPolicy] = None,
+        max_connections: int = 8,
+        timeout: float = REQUEST_TIMEOUT,
+        compress_requests: bool = False,
+        cassette: Optional[Cassette] = None
+    ):
+        self.headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            **(headers or {})
+        }
+        self.retry = retry or RetryPolicy()
+        # Gzip bodies of COMPRESS_MIN_BYTES or more; switched off if the server rejects the encoding
+        self.compress_requests = compress_requests
+        self.bucket = TokenBucket(rate_limit, burst) if rate_limit else None
+        # Record to or replay from a cassette when one is given or named by API_CASSETTE
+        self.cassette = cassette or Cassette.from_env()
+        self._pool = ConnectionPool(base_url, max_idle=max_connections, timeout=timeout)
+        if self.cassette and self.cassette.mode == "replay":
+            self._pool = ReplayPool(base_url, self.cassette)
+        elif self.cassette:
+            self._pool = RecordingPool(self._pool, base_url, self.cassette)
+
+    def __enter__(self) -> "ApiTransport":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self._pool.close()
+
+    def request_json(self, method: str, path: str, data: Optional[Any] = None,
+                     idempotency_key: Optional[str] = None, idempotent: bool = False) -> Dict[str, Any]:
+        """
+        Send a JSON request, retrying rate-limited and failed attempts.
+
+        POST requests always carry an Idempotency-Key (a random one if none
+        is given), reused on every retry of this call. Many servers ignore
+        the key, so a POST or PATCH is only re-sent after a network error
+        or 5xx when idempotent is set, for an endpoint known to honor it.
+        Otherwise it is retried only when it never reached the server: a
+        refused connection, or a 429 (rejected without being processed).
+
+        With compress_requests, large bodies are sent gzipped. A 415, or a
+        400/422 whose error mentions the encoding, turns compression off
+        and resends the body uncompressed.
+
+        Raises:
+            ApiError: on a 4xx/5xx response once retries are exhausted
+        """
+        headers = dict(self.headers)
+        if method == "POST":
+            idempotency_key = idempotency_key or uuid.uuid4().hex
+        if idempotency_key:
+            headers["Idempotency-Key"] = idempotency_key
+
+        body = None
+        if data is not None:
+            body = encode_json_body(data, compress=self.compress_requests)
+            if self.compress_requests:
+                if self._gzip_input_size(body) < COMPRESS_MIN_BYTES:
+                    body = encode_json_body(data)  # too small to be worth it; send plain
+                else:
+                    headers["Content-Encoding"] = "gzip"
+        replay_safe = method in SAFE_METHODS or idempotent
+
+        attempt = 0
+        while True:
+            attempt += 1
+            if self.bucket:
+                with span("http.rate_limit_wait"):
+                    self.bucket.acquire()
+
+            try:
+                status, response_headers, payload = self._pool.request(method, path, body, headers, replay_safe)
+            except NETWORK_ERRORS as e:
+                if not (replay_safe or isinstance(e, NOT_SENT_ERRORS)) or attempt >= self.retry.max_attempts:
+                    raise
+                count("http.retries", reason=type(e).__name__)
+                with span("http.retry_backoff"):
+                    time.sleep(self.retry.delay(attempt))
+                continue
+
+            if status < 400:
+                return json.loads(payload.decode()) if payload.strip() else {}
+
+            if headers.get("Content-Encoding") == "gzip" and self._encoding_rejected(status, payload):
+                # The server doesn't take gzipped bodies; remember that and resend as plain JSON
+                self.compress_requests = False
+                del headers["Content-Encoding"]
+                body = encode_json_body(data)
+                attempt -= 1
+                continue
+
+            retry_after = parse_retry_after(response_headers.get("retry-after"))
+            retryable = status in self.retry.retry_statuses and (replay_safe or status == 429)
+            if retryable and attempt < self.retry.max_attempts:
+                count("http.retries", reason=status)
+                with span("http.retry_backoff"):
+                    time.sleep(self.retry.delay(attempt, retry_after))
+                continue
+
+            raise self._error(status, payload, retry_after)
+
+    @staticmethod
+    def _encoding_rejected(status: int, payload: bytes) -> bool:
+        """Whether an error response to a gzipped body means the server can't take gzip."""
+        if status == 415:
+            return True
+        return status in (400, 422) and bool(ENCODING_REJECTED.search(payload.decode(errors="replace")))
+
+    @staticmethod
+    def _gzip_input_size(compressed: bytes) -> int:
+        """Uncompressed size of a gzip body, from its trailer (mod 2**32)."""
+        return int.from_bytes(compressed[-4:], "little")
+
+    @staticmethod
+    def _error(status: int, payload: bytes, retry_after: Optional[float]) -> ApiError:
+        error_body = payload.decode(errors="replace")
+        try:
+            error_data = json.loads(error_body)
+        except json.JSONDecodeError:
+            return ApiError(status, error_body, error_body, retry_after)
+
+        message = error_body
+        if isinstance(error_data, dict):
+            message = error_data.get("message") or error_data.get("errors") or error_body
+            if isinstance(message, list):
+                message = "; ".join(str(item) for item in message)
+        return ApiError(status, str(message), error_body, retry_after)
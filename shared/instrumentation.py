@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Instrumentation
+
+Opt-in timing spans and counters shared by the skill scripts. Each skill
+symlinks this file into its scripts/ directory.
+
+Off unless SKILL_METRICS names an output file. When it is off, timed()
+returns the function undecorated, span() returns a shared no-op and
+count() returns at once, so instrumented hot paths cost nothing
+measurable.
+
+When it is on, every span is kept and written at exit:
+  - JSON lines (the default): one {"type": "span", ...} record per span,
+    then one {"type": "counter", ...} record per counter
+  - Prometheus text format, when SKILL_METRICS ends in .prom or
+    SKILL_METRICS_FORMAT=prometheus: a count/sum summary per span name and
+    label set, plus the counters (for node_exporter's textfile collector)
+
+Span attributes become Prometheus labels, so keep them low-cardinality
+(methods, endpoints, statuses), never IDs or text.
+
+Usage:
+    SKILL_METRICS=/tmp/run.jsonl python kit_broadcast.py --batch q1.jsonl
+    SKILL_METRICS=/tmp/run.prom python hook_analyzer.py score hooks.jsonl > scores.jsonl
+"""
+
+import atexit
+import functools
+import json
+import os
+import re
+import sys
+import threading
+import time
+from multiprocessing import parent_process
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple
+
+
+METRICS_PATH = os.environ.get("SKILL_METRICS", "")
+ENABLED = bool(METRICS_PATH)
+METRICS_FORMATS = ("jsonl", "prometheus")
+METRICS_FORMAT = (os.environ.get("SKILL_METRICS_FORMAT") or (
+    "prometheus" if METRICS_PATH.endswith(".prom") else "jsonl"
+)).lower()
+if METRICS_FORMAT not in METRICS_FORMATS:
+    if ENABLED:
+        print(f"Warning: unknown SKILL_METRICS_FORMAT {METRICS_FORMAT!r} "
+              f"(expected {' or '.join(METRICS_FORMATS)}); writing jsonl", file=sys.stderr)
+    METRICS_FORMAT = "jsonl"
+FLUSH_EVERY = 10_000  # spans buffered before the main process writes them out (JSON lines)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+_lock = threading.Lock()
+_spans: List[Dict[str, Any]] = []
+_span_totals: Dict[Tuple[str, Labels], List[float]] = {}  # (name, labels) -> [count, sum]
+_counters: Dict[Tuple[str, Labels], float] = {}
+_sink: Optional[TextIO] = None
+
+
+def _labels(attrs: Dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in attrs.items()))
+
+
+def record_span(name: str, duration: float, attrs: Optional[Dict[str, Any]] = None,
+                start: Optional[float] = None) -> None:
+    """Record a finished span measured elsewhere (e.g. one phase of an HTTP call)."""
+    if not ENABLED:
+        return
+    attrs = attrs or {}
+    record = {"type": "span", "name": name, "start": start if start is not None else time.time() - duration,
+              "duration": duration, "attrs": attrs, "pid": os.getpid()}
+    key = (name, _labels(attrs))
+    with _lock:
+        totals = _span_totals.setdefault(key, [0, 0.0])
+        totals[0] += 1
+        totals[1] += duration
+        _spans.append(record)
+        if len(_spans) >= FLUSH_EVERY and _is_main_process():
+            _flush_spans()
+
+
+def count(name: str, value: float = 1, **labels: Any) -> None:
+    """Add to a counter, e.g. count("http.requests", method="GET", status=200)."""
+    if not ENABLED:
+        return
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+class _Span:
+    """A running span; set() adds attributes before it ends."""
+
+    __slots__ = ("name", "attrs", "start", "_started")
+
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self) -> "_Span":
+        self.start = time.time()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        duration = time.perf_counter() - self._started
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        record_span(self.name, duration, self.attrs, self.start)
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        pass
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str, **attrs: Any):
+    """Time a block: `with span("kit.index_sync", kind="tags"): ...`."""
+    if not ENABLED:
+        return _NOOP_SPAN
+    return _Span(name, attrs)
+
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    """Decorator timing every call as a span. Returns the function itself when disabled."""
+    def decorate(fn: Callable) -> Callable:
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.time()
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record_span(name, time.perf_counter() - started, None, start)
+        return wrapper
+    return decorate
+
+
+def drain() -> Dict[str, Any]:
+    """Take everything recorded so far in this process, to hand to merge() in another."""
+    with _lock:
+        records = {"spans": list(_spans), "counters": [[name, dict(labels), value]
+                                                       for (name, labels), value in _counters.items()]}
+        _spans.clear()
+        _span_totals.clear()
+        _counters.clear()
+    return records
+
+
+def merge(records: Optional[Dict[str, Any]]) -> None:
+    """Fold records drained in a worker process into this one."""
+    if not ENABLED or not records:
+        return
+    for record in records["spans"]:
+        record_span(record["name"], record["duration"], record["attrs"], record["start"])
+    for name, labels, value in records["counters"]:
+        count(name, value, **labels)
+
+
+def run_recorded(fn: Callable, *args: Any) -> Tuple[Any, Dict[str, Any]]:
+    """Call fn in a worker process and return (result, the spans and counters it recorded)."""
+    result = fn(*args)
+    return result, drain()
+
+
+def _reset_after_fork() -> None:
+    # A forked worker starts empty; the parent keeps (and exports) what it had recorded
+    global _sink
+    _spans.clear()
+    _span_totals.clear()
+    _counters.clear()
+    _sink = None
+
+
+def _is_main_process() -> bool:
+    return parent_process() is None
+
+
+def _open_sink() -> TextIO:
+    """The JSON lines file, opened (and truncated) on first use (caller holds _lock)."""
+    global _sink
+    if _sink is None:
+        _sink = open(METRICS_PATH, "w")
+    return _sink
+
+
+def _flush_spans() -> None:
+    """Write buffered spans to the JSON lines file (caller holds _lock)."""
+    if METRICS_FORMAT != "jsonl":
+        _spans.clear()  # Prometheus output only needs the running totals
+        return
+    sink = _open_sink()
+    for record in _spans:
+        sink.write(json.dumps(record) + "\n")
+    _spans.clear()
+
+
+def format_prometheus() -> str:
+    """The span totals and counters in Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        span_totals = sorted(_span_totals.items())
+        counters = sorted(_counters.items())
+
+    if span_totals:
+        lines.append("# HELP skill_span_seconds Time spent in instrumented spans.")
+        lines.append("# TYPE skill_span_seconds summary")
+        for (name, labels), (calls, total) in span_totals:
+            label_text = _format_labels((("span", name),) + labels)
+            lines.append(f"skill_span_seconds_count{label_text} {calls}")
+            lines.append(f"skill_span_seconds_sum{label_text} {total:.9f}")
+
+    for metric in dict.fromkeys(name for (name, _), _ in counters):
+        metric_name = "skill_" + re.sub(r"[^a-zA-Z0-9_]", "_", metric) + "_total"
+        lines.append(f"# TYPE {metric_name} counter")
+        for (name, labels), value in counters:
+            if name == metric:
+                lines.append(f"{metric_name}{_format_labels(labels)} {_format_value(value)}")
+
+    return "\n".join(lines) + "\n"
+
+
+def _format_value(value: float) -> str:
+    # Exact, never rounded to 6 significant digits the way "g" formatting would
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels) + "}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def export() -> None:
+    """Write everything recorded to SKILL_METRICS; runs at exit in the main process."""
+    global _sink
+    if not ENABLED or not _is_main_process():
+        return
+
+    if METRICS_FORMAT == "prometheus":
+        text = format_prometheus()
+        with open(METRICS_PATH, "w") as f:
+            f.write(text)
+        return
+
+    with _lock:
+        sink = _open_sink()
+        _flush_spans()
+        for (name, labels), value in sorted(_counters.items()):
+            sink.write(json.dumps({"type": "counter", "name": name, "labels": dict(labels), "value": value}) + "\n")
+        sink.close()
+        _sink = None
+
+
+if ENABLED:
+    os.register_at_fork(after_in_child=_reset_after_fork)
+    atexit.register(export)
@@ -0,0 +1,37 @@
+"""
+Typefully client shared by the tweet and linkedin skills.
+
+Each skill symlinks this package into its scripts/ directory next to a thin
+typefully_scheduler.py CLI shim. Names are re-exported lazily, so importing
+the package (or the shim) doesn't load the CLI, the cache or the planner
+until they are used.
+"""
+
+from importlib import import_module
+from typing import Any
+
+
+_EXPORTS = {
+    "API_BASE": "client",
+    "DEFAULT_RATE_LIMIT": "client",
+    "ScheduleResult": "client",
+    "TypefullyScheduler": "client",
+    "PLATFORMS": "drafts",
+    "build_draft": "drafts",
+    "load_manifest": "drafts",
+    "TypefullyCache": "cache",
+    "PostingWindow": "planner",
+    "SlotPlanner": "planner",
+    "CliProfile": "cli",
+    "main": "cli",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
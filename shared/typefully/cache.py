@@ -0,0 +1,204 @@
+"""
+Typefully Cache
+
+Local SQLite cache of Typefully drafts and social-set details.
+
+Cached responses are served until they are older than the TTL. Drafts are
+then synced incrementally: only drafts updated since the last sync are
+fetched and upserted, with a full resync of the schedule once a day (or on
+--refresh) to drop drafts deleted on the server.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+
+DEFAULT_TTL = float(os.environ.get("TYPEFULLY_CACHE_TTL", 300))  # seconds
+FULL_SYNC_INTERVAL = 24 * 60 * 60  # seconds
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS drafts (
+    social_set_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    status TEXT,
+    scheduled_at REAL,
+    updated_at TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (social_set_id, id)
+);
+CREATE INDEX IF NOT EXISTS drafts_schedule ON drafts (social_set_id, status, scheduled_at);
+CREATE TABLE IF NOT EXISTS resources (
+    key TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    social_set_id TEXT PRIMARY KEY,
+    synced_at REAL NOT NULL,
+    full_synced_at REAL NOT NULL,
+    cursor TEXT
+);
+"""
+
+
+def default_cache_path() -> str:
+    """Cache file under $TYPEFULLY_CACHE_DIR, else the user cache dir (XDG)."""
+    cache_dir = os.environ.get("TYPEFULLY_CACHE_DIR") or os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "typefully"
+    )
+    return os.path.join(cache_dir, "cache.sqlite3")
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[float]:
+    """Parse an ISO 8601 timestamp (including a trailing 'Z') to epoch seconds."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+@dataclass
+class SyncState:
+    synced_at: float
+    full_synced_at: float
+    cursor: Optional[str] = None
+
+
+class TypefullyCache:
+    """Thread-safe SQLite store for drafts and API responses, with a TTL."""
+
+    def __init__(self, path: Optional[str] = None, ttl: float = DEFAULT_TTL):
+        self.path = path or default_cache_path()
+        self.ttl = ttl
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def __enter__(self) -> "TypefullyCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    def is_fresh(self, fetched_at: float) -> bool:
+        return time.time() - fetched_at < self.ttl
+
+    # Whole responses (social sets, social-set details)
+
+    def get_resource(self, key: str) -> Optional[Any]:
+        """Return a cached response, or None if it is missing or older than the TTL."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, fetched_at FROM resources WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or not self.is_fresh(row[1]):
+            return None
+        return json.loads(row[0])
+
+    def put_resource(self, key: str, data: Any) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO resources (key, data, fetched_at) VALUES (?, ?, ?)",
+                (key, json.dumps(data), time.time())
+            )
+
+    # Drafts
+
+    def sync_state(self, social_set_id: str) -> Optional[SyncState]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT synced_at, full_synced_at, cursor FROM sync_state WHERE social_set_id = ?",
+                (social_set_id,)
+            ).fetchone()
+        return SyncState(*row) if row else None
+
+    def needs_full_sync(self, state: Optional[SyncState]) -> bool:
+        return state is None or time.time() - state.full_synced_at >= FULL_SYNC_INTERVAL
+
+    def upsert_drafts(self, social_set_id: str, drafts: Iterable[Dict[str, Any]]) -> None:
+        """Insert or update drafts, e.g. ones just created or changed since the last sync."""
+        rows = [self._draft_row(social_set_id, draft) for draft in drafts if draft.get("id") is not None]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO drafts (social_set_id, id, status, scheduled_at, updated_at, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def record_sync(self, social_set_id: str, drafts: List[Dict[str, Any]], full: bool,
+                    started_at: Optional[float] = None) -> None:
+        """Store the drafts from a sync and advance the sync cursor.
+
+        A full sync replaces every cached draft for the social set. If no
+        draft carries an updated_at, the cursor falls back to when the
+        sync started (default: now), so the next incremental sync still
+        has somewhere to stop.
+        """
+        now = time.time()
+        state = self.sync_state(social_set_id)
+        candidates = [d.get("updated_at") for d in drafts]
+        if state and not full:
+            candidates.append(state.cursor)
+        cursor = max((c for c in candidates if parse_timestamp(c) is not None),
+                     key=parse_timestamp, default=None)
+        if cursor is None:
+            cursor = datetime.fromtimestamp(started_at or now, timezone.utc).isoformat()
+        full_synced_at = now if full or state is None else state.full_synced_at
+
+        rows = [self._draft_row(social_set_id, draft) for draft in drafts if draft.get("id") is not None]
+        with self._lock, self._conn:
+            if full:
+                self._conn.execute("DELETE FROM drafts WHERE social_set_id = ?", (social_set_id,))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO drafts (social_set_id, id, status, scheduled_at, updated_at, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (social_set_id, synced_at, full_synced_at, cursor) "
+                "VALUES (?, ?, ?, ?)",
+                (social_set_id, now, full_synced_at, cursor)
+            )
+
+    def scheduled_drafts(self, social_set_id: str, limit: Optional[int] = None,
+                         until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return cached scheduled drafts in scheduled-date order."""
+        query = ("SELECT data FROM drafts WHERE social_set_id = ? AND status = 'scheduled' "
+                 "AND scheduled_at IS NOT NULL")
+        params: List[Any] = [social_set_id]
+        if until:
+            query += " AND scheduled_at <= ?"
+            params.append(parse_timestamp(until))
+        query += " ORDER BY scheduled_at"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    @staticmethod
+    def _draft_row(social_set_id: str, draft: Dict[str, Any]) -> tuple:
+        return (
+            str(social_set_id),
+            str(draft["id"]),
+            draft.get("status"),
+            parse_timestamp(draft.get("scheduled_date")),
+            draft.get("updated_at"),
+            json.dumps(draft)
+        )
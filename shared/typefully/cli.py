@@ -0,0 +1,416 @@
+"""
+Command-line interface shared by the tweet and linkedin typefully_scheduler.py
+shims. Each shim describes its skill with a CliProfile and calls main().
+"""
+
+import argparse
+import os
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timedelta, tzinfo
+from typing import Any, Dict, List, Optional, Tuple
+
+from .client import DEFAULT_RATE_LIMIT, TypefullyScheduler, _parse_datetime
+from .drafts import build_draft, load_manifest, render_for_social_set
+from .formatting import (
+    format_fanout_summary,
+    format_manifest_summary,
+    format_result,
+    format_scheduled_drafts,
+    format_social_set_details,
+    format_social_sets,
+)
+from .planner import PostingWindow
+
+
+@dataclass(frozen=True)
+class CliProfile:
+    """What a skill's CLI schedules, and how it talks about it."""
+    noun: str  # e.g. "tweet", "LinkedIn post"
+    plural: str  # e.g. "tweets", "LinkedIn posts"
+    platforms: Tuple[str, ...] = ("x",)  # --platform choices; the first is the default
+    threads: bool = False  # manifest entries may give a "posts" list
+    epilog: str = ""
+
+
+def get_env_or_exit(name: str) -> str:
+    """Get an environment variable or exit with an error."""
+    value = os.environ.get(name)
+    if not value:
+        print(f"Error: {name} environment variable is not set.")
+        print(f"\nTo set it, run:")
+        print(f"  export {name}=your_value_here")
+        sys.exit(1)
+    return value
+
+
+def open_cache():
+    """Open the local cache, or return None (no caching) if it can't be opened."""
+    import sqlite3
+
+    from .cache import TypefullyCache
+
+    try:
+        return TypefullyCache()
+    except (sqlite3.Error, OSError) as e:
+        print(f"Warning: local cache disabled: {e}", file=sys.stderr)
+        return None
+
+
+def build_parser(profile: CliProfile) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description=f"Schedule {profile.plural} via Typefully API",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=profile.epilog
+    )
+    parser.add_argument("--file", "-f", help=f"Path to file containing {profile.noun} text")
+    parser.add_argument("--schedule", "-s", default="next-free-slot",
+                        help="When to publish: 'now', 'next-free-slot', or ISO 8601 datetime")
+    parser.add_argument("--draft", action="store_true",
+                        help="Save as draft without scheduling (overrides --schedule)")
+    if len(profile.platforms) > 1:
+        parser.add_argument("--platform", "-p", default=profile.platforms[0], choices=profile.platforms,
+                            help=f"Target platform: {', '.join(repr(p) for p in profile.platforms)} "
+                                 f"(default: {profile.platforms[0]})")
+    parser.add_argument("--share", action="store_true", help="Generate a public share URL")
+    parser.add_argument("--manifest", "-m",
+                        help="JSONL or JSON file of posts to schedule in one run")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Maximum concurrent requests in --manifest and --social-sets mode (default: 4)")
+    parser.add_argument("--social-sets",
+                        help="Fan out to these social sets instead of TYPEFULLY_SOCIAL_SET_ID: "
+                             "comma-separated IDs or usernames, or 'all'")
+    parser.add_argument("--template", action="store_true",
+                        help="With --social-sets, fill $name, $username and $id in the text per social set")
+    parser.add_argument("--rate-limit", type=float, default=DEFAULT_RATE_LIMIT,
+                        help=f"Client-side request limit per second (default: {DEFAULT_RATE_LIMIT:g})")
+    parser.add_argument("--window", action="append",
+                        help="Posting window for locally planned slots, e.g. 'mon-fri 09:00-17:00' "
+                             "(repeatable); 'next-free-slot' is then resolved locally")
+    parser.add_argument("--min-spacing", type=int, default=60,
+                        help="Minimum minutes between planned and scheduled posts (default: 60)")
+    parser.add_argument("--timezone",
+                        help="IANA timezone for --window and for --until/publish_at times without an "
+                             "offset, e.g. America/Chicago (default: local)")
+    parser.add_argument("--list-scheduled", action="store_true", help="List currently scheduled posts")
+    parser.add_argument("--limit", type=int, default=20,
+                        help="Maximum posts shown by --list-scheduled, 0 for all (default: 20)")
+    parser.add_argument("--until", help="Only list posts scheduled up to this ISO 8601 datetime")
+    parser.add_argument("--list-social-sets", action="store_true", help="List available social sets")
+    parser.add_argument("--details", action="store_true", help="Show social set details")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Ignore the local cache and re-fetch from Typefully")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Don't read or write the local cache")
+    parser.set_defaults(platform=profile.platforms[0])
+    return parser
+
+
+def main(profile: CliProfile, argv: Optional[List[str]] = None) -> None:
+    parser = build_parser(profile)
+    args = parser.parse_args(argv)
+
+    if args.until:
+        # Pin a bare --until to the profile timezone so it compares with the API's aware times
+        from zoneinfo import ZoneInfoNotFoundError
+
+        try:
+            args.until = _parse_datetime(args.until, resolve_timezone(args.timezone)).isoformat()
+        except (ValueError, ZoneInfoNotFoundError) as e:
+            parser.error(f"--until: {e}")
+
+    api_key = get_env_or_exit("TYPEFULLY_API_KEY")
+    cache = None if args.no_cache else open_cache()
+
+    try:
+        # Handle --list-social-sets and --social-sets fan-out, which need no default social set
+        if args.list_social_sets or args.social_sets:
+            with TypefullyScheduler(api_key, "", rate_limit=args.rate_limit, cache=cache) as scheduler:
+                if args.social_sets:
+                    run_fanout(profile, args, parser, scheduler)
+                    return
+                try:
+                    social_sets = scheduler.list_social_sets(refresh=args.refresh)
+                    print(format_social_sets(social_sets))
+                except Exception as e:
+                    print(f"Error fetching social sets: {e}")
+                    sys.exit(1)
+            return
+
+        social_set_id = get_env_or_exit("TYPEFULLY_SOCIAL_SET_ID")
+        with TypefullyScheduler(api_key, social_set_id, rate_limit=args.rate_limit, cache=cache) as scheduler:
+            run(profile, args, parser, scheduler)
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+def run(profile: CliProfile, args: argparse.Namespace, parser: argparse.ArgumentParser,
+        scheduler: TypefullyScheduler) -> None:
+    """Run the requested action against a social set, reusing one connection pool."""
+    social_set_id = scheduler.social_set_id
+
+    # Handle --manifest
+    if args.manifest:
+        run_manifest(profile, args, scheduler)
+        return
+
+    # Handle --details
+    if args.details:
+        try:
+            details = scheduler.get_social_set_details(social_set_id, refresh=args.refresh)
+            print(format_social_set_details(details))
+        except Exception as e:
+            print(f"Error fetching details: {e}")
+            sys.exit(1)
+        return
+
+    # Handle --list-scheduled
+    if args.list_scheduled:
+        try:
+            limit = args.limit or None
+            scheduled_drafts = scheduler.list_scheduled_drafts(limit, args.until, refresh=args.refresh)
+            print(format_scheduled_drafts(scheduled_drafts))
+        except Exception as e:
+            print(f"Error fetching scheduled posts: {e}")
+            sys.exit(1)
+        return
+
+    text = read_post_file(profile, args, parser)
+
+    # Show currently scheduled posts for context
+    try:
+        scheduled_drafts = scheduler.list_scheduled_drafts()
+        if scheduled_drafts:
+            print(format_scheduled_drafts(scheduled_drafts))
+            print()
+    except Exception:
+        pass  # Non-fatal, continue with scheduling
+
+    # Schedule or draft the post
+    publish_at = None if args.draft else args.schedule
+    publish_at = plan_publish_times(args, scheduler, [publish_at])[0]
+    if args.draft:
+        print(f"Saving {profile.noun} as draft...")
+    else:
+        print(f"Scheduling {profile.noun}...")
+        print(f"  Schedule: {publish_at}")
+    print(f"  Content preview: {text[:50]}{'...' if len(text) > 50 else ''}")
+    print()
+
+    result = scheduler.schedule(text, args.platform, publish_at, args.share)
+    print(format_result(result, profile.noun))
+
+    if not result.success:
+        sys.exit(1)
+
+
+def read_post_file(profile: CliProfile, args: argparse.Namespace,
+                   parser: argparse.ArgumentParser) -> str:
+    """Read the post text from --file, exiting with an error if it's missing or empty."""
+    if not args.file:
+        parser.error(f"--file is required when scheduling a {profile.noun}")
+
+    try:
+        with open(args.file, "r") as f:
+            text = f.read().strip()
+    except FileNotFoundError:
+        print(f"Error: File not found: {args.file}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error reading file: {e}")
+        sys.exit(1)
+
+    if not text:
+        print(f"Error: {profile.noun[0].upper() + profile.noun[1:]} file is empty")
+        sys.exit(1)
+    return text
+
+
+def resolve_timezone(name: Optional[str]) -> tzinfo:
+    """An IANA timezone by name, or the local timezone."""
+    if name:
+        from zoneinfo import ZoneInfo
+        return ZoneInfo(name)
+    return datetime.now().astimezone().tzinfo
+
+
+def plan_publish_times(
+    args: argparse.Namespace,
+    scheduler: TypefullyScheduler,
+    publish_times: List[Optional[str]]
+) -> List[Optional[str]]:
+    """Replace each "next-free-slot" with a locally planned time when --window is given."""
+    pending = [i for i, publish_at in enumerate(publish_times) if publish_at == "next-free-slot"]
+    if not args.window or not pending:
+        return publish_times
+
+    from zoneinfo import ZoneInfoNotFoundError
+
+    try:
+        windows = [PostingWindow.parse(spec) for spec in args.window]
+        tz = resolve_timezone(args.timezone)
+        reserved = []
+        for publish_at in publish_times:
+            if publish_at and publish_at not in ("now", "next-free-slot"):
+                reserved.append(_parse_datetime(publish_at, tz))
+        slots = scheduler.plan_slots(len(pending), windows, timedelta(minutes=args.min_spacing),
+                                     tz, reserved)
+    except (ValueError, ZoneInfoNotFoundError) as e:
+        print(f"Error planning slots: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error fetching scheduled posts: {e}")
+        sys.exit(1)
+
+    if len(slots) < len(pending):
+        unscheduled = ", ".join(str(index + 1) for index in pending[len(slots):])
+        print(f"Error planning slots: no slot for entries {unscheduled}")
+        sys.exit(1)
+
+    planned = list(publish_times)
+    for index, slot in zip(pending, slots):
+        planned[index] = slot
+    return planned
+
+
+def entry_draft(profile: CliProfile, args: argparse.Namespace, entry: Dict[str, Any],
+                publish_at: Optional[str], number: int) -> Dict[str, Any]:
+    """Build the draft for one manifest entry, exiting on an unsupported platform."""
+    share = entry.get("share", args.share)
+    if profile.threads and entry.get("posts"):
+        # Threads are X-only
+        return build_draft(entry["posts"], "x", publish_at, share)
+
+    platform = entry.get("platform", args.platform)
+    if platform not in profile.platforms:
+        print(f"Error reading manifest: Entry {number}: unsupported platform {platform!r}")
+        sys.exit(1)
+    return build_draft(entry["text"], platform, publish_at, share)
+
+
+def read_manifest(profile: CliProfile, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Load --manifest, exiting with an error if it can't be read or is empty."""
+    try:
+        entries = load_manifest(args.manifest, allow_threads=profile.threads)
+    except FileNotFoundError as e:
+        print(f"Error: File not found: {e.filename}")
+        sys.exit(1)
+    except (ValueError, OSError) as e:
+        print(f"Error reading manifest: {e}")
+        sys.exit(1)
+
+    if not entries:
+        print("Error: Manifest is empty")
+        sys.exit(1)
+    return entries
+
+
+def run_manifest(profile: CliProfile, args: argparse.Namespace, scheduler: TypefullyScheduler) -> None:
+    """Schedule every post in a manifest in one process, over shared connections."""
+    entries = read_manifest(profile, args)
+
+    # Show currently scheduled posts for context, once for the whole batch
+    try:
+        scheduled_drafts = scheduler.list_scheduled_drafts()
+        if scheduled_drafts:
+            print(format_scheduled_drafts(scheduled_drafts))
+            print()
+    except Exception:
+        pass  # Non-fatal, continue with scheduling
+
+    default_publish_at = None if args.draft else args.schedule
+    publish_times = plan_publish_times(
+        args, scheduler, [entry.get("publish_at", default_publish_at) for entry in entries]
+    )
+
+    drafts = [
+        entry_draft(profile, args, entry, publish_at, number)
+        for number, (entry, publish_at) in enumerate(zip(entries, publish_times), 1)
+    ]
+
+    print(f"Submitting {len(drafts)} {profile.plural} (concurrency {args.concurrency})...")
+    print()
+
+    results = scheduler.create_drafts(drafts, args.concurrency)
+    print(format_manifest_summary(entries, results))
+
+    if not all(result.success for result in results):
+        sys.exit(1)
+
+
+def resolve_social_sets(scheduler: TypefullyScheduler, spec: str, refresh: bool = False) -> List[Dict[str, Any]]:
+    """
+    Resolve --social-sets to social set records.
+
+    Args:
+        spec: "all", or comma-separated social set IDs or usernames
+
+    Raises:
+        ValueError: if a requested social set isn't in the account
+    """
+    available = scheduler.list_social_sets(refresh=refresh)
+    if spec.strip().lower() == "all":
+        return available
+
+    lookup = {}
+    for social_set in available:
+        lookup[str(social_set.get("id"))] = social_set
+        if social_set.get("username"):
+            lookup[social_set["username"].lstrip("@").lower()] = social_set
+
+    selected = []
+    for name in (part.strip() for part in spec.split(",")):
+        if not name:
+            continue
+        social_set = lookup.get(name) or lookup.get(name.lstrip("@").lower())
+        if social_set is None:
+            raise ValueError(f"Unknown social set: {name}")
+        if social_set not in selected:
+            selected.append(social_set)
+    return selected
+
+
+def run_fanout(profile: CliProfile, args: argparse.Namespace, parser: argparse.ArgumentParser,
+               scheduler: TypefullyScheduler) -> None:
+    """Submit the same post (or manifest) to several social sets at once, with one report."""
+    entries = read_manifest(profile, args) if args.manifest else [{"text": read_post_file(profile, args, parser)}]
+
+    try:
+        social_sets = resolve_social_sets(scheduler, args.social_sets, refresh=args.refresh)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error fetching social sets: {e}")
+        sys.exit(1)
+
+    if not social_sets:
+        print("Error: No social sets to post to")
+        sys.exit(1)
+
+    default_publish_at = None if args.draft else args.schedule
+    rows, drafts, targets = [], [], []
+    for social_set in social_sets:
+        social_set_id = str(social_set["id"])
+        # Each account has its own calendar, so slots are planned per social set
+        publish_times = plan_publish_times(
+            args, scheduler.for_social_set(social_set_id),
+            [entry.get("publish_at", default_publish_at) for entry in entries]
+        )
+        for number, (entry, publish_at) in enumerate(zip(entries, publish_times), 1):
+            if args.template:
+                entry = render_for_social_set(entry, social_set)
+            drafts.append(entry_draft(profile, args, entry, publish_at, number))
+            targets.append(social_set_id)
+            rows.append((social_set, entry))
+
+    print(f"Submitting {len(drafts)} {profile.plural} to {len(social_sets)} social sets "
+          f"(concurrency {args.concurrency})...")
+    print()
+
+    results = scheduler.create_drafts(drafts, args.concurrency, social_set_ids=targets)
+    print(format_fanout_summary(rows, results))
+
+    if not all(result.success for result in results):
+        sys.exit(1)
@@ -0,0 +1,365 @@
+"""
+Typefully API client: drafts, scheduling and social sets, over the shared
+pooled, rate-limited transport.
+"""
+
+import hashlib
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, tzinfo
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+from urllib.parse import urlencode, urlsplit
+
+from api_transport import ApiTransport, RetryPolicy
+from instrumentation import count, timed
+
+from .drafts import build_draft
+from .planner import DEFAULT_HORIZON_DAYS, PostingWindow, SlotPlanner
+
+if TYPE_CHECKING:
+    from .cache import TypefullyCache
+
+
+API_BASE = os.environ.get("TYPEFULLY_API_BASE", "https://api.typefully.com/v2")
+DEFAULT_RATE_LIMIT = 5.0  # requests per second, client-side
+
+
+@dataclass
+class ScheduleResult:
+    success: bool
+    draft_id: Optional[str] = None
+    status: Optional[str] = None
+    scheduled_date: Optional[str] = None
+    share_url: Optional[str] = None
+    error: Optional[str] = None
+
+
+class TypefullyScheduler:
+    def __init__(
+        self,
+        api_key: str,
+        social_set_id: str,
+        api_base: str = API_BASE,
+        rate_limit: Optional[float] = DEFAULT_RATE_LIMIT,
+        retry: Optional[RetryPolicy] = None,
+        cache: Optional["TypefullyCache"] = None,
+        transport: Optional[ApiTransport] = None
+    ):
+        self.api_key = api_key
+        self.social_set_id = social_set_id
+        self.cache = cache
+        self._api_path = urlsplit(api_base).path.rstrip("/")
+        # A transport passed in is shared (see for_social_set) and closed by its owner
+        self._owns_transport = transport is None
+        self._transport = transport or ApiTransport(
+            api_base,
+            headers={"Authorization": f"Bearer {api_key}"},
+            rate_limit=rate_limit,
+            retry=retry
+        )
+
+    def __enter__(self) -> "TypefullyScheduler":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the pooled connections to the Typefully API."""
+        if self._owns_transport:
+            self._transport.close()
+
+    def for_social_set(self, social_set_id: str) -> "TypefullyScheduler":
+        """A scheduler for another social set, sharing this one's connections, rate limit and cache."""
+        scheduler = TypefullyScheduler(self.api_key, social_set_id, cache=self.cache, transport=self._transport)
+        scheduler._api_path = self._api_path
+        return scheduler
+
+    @timed("typefully.request")
+    def _make_request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict] = None,
+        idempotency_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Make an authenticated request to the Typefully API, rate limited and retried on 429 (and 5xx for reads)."""
+        return self._transport.request_json(method, endpoint, data, idempotency_key)
+
+    def list_social_sets(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """List all available social sets, from the cache while it is fresh."""
+        # Social sets depend on the account, so key them by a hash of the API key
+        key = "social-sets:" + hashlib.sha256(self.api_key.encode()).hexdigest()[:16]
+        return self._cached(key, refresh, lambda: self._make_request("GET", "/social-sets").get("results", []))
+
+    def get_social_set_details(self, social_set_id: str, refresh: bool = False) -> Dict[str, Any]:
+        """Get detailed info about a social set including connected platforms."""
+        return self._cached(f"social-set:{social_set_id}", refresh,
+                            lambda: self._make_request("GET", f"/social-sets/{social_set_id}/"))
+
+    def _cached(self, key: str, refresh: bool, fetch: Callable[[], Any]) -> Any:
+        """Return a cached response for key, fetching and storing it when stale or refreshing."""
+        if self.cache is None:
+            return fetch()
+        if not refresh:
+            cached = self.cache.get_resource(key)
+            if cached is not None:
+                count("typefully.cache", result="hit")
+                return cached
+        count("typefully.cache", result="miss")
+        data = fetch()
+        self.cache.put_resource(key, data)
+        return data
+
+    def iter_drafts(
+        self,
+        status: Optional[str] = None,
+        order_by: Optional[str] = None,
+        page_size: int = 50
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yield drafts across every page of results.
+
+        Args:
+            status: Server-side status filter, e.g. "scheduled" or "draft"
+            order_by: Server-side ordering, e.g. "scheduled_date"
+            page_size: Drafts fetched per request
+
+        Yields:
+            Draft dicts, one page fetched at a time
+        """
+        params = {"limit": page_size}
+        if status:
+            params["status"] = status
+        if order_by:
+            params["order_by"] = order_by
+
+        endpoint = f"/social-sets/{self.social_set_id}/drafts?{urlencode(params)}"
+        offset = 0
+        while endpoint:
+            response = self._make_request("GET", endpoint)
+            results = response.get("results", [])
+            yield from results
+
+            if response.get("next"):
+                endpoint = self._endpoint_from_url(response["next"])
+            elif "next" not in response and len(results) == page_size:
+                # No cursor in the response: fall back to offset paging
+                offset += page_size
+                endpoint = (f"/social-sets/{self.social_set_id}/drafts?"
+                            f"{urlencode({**params, 'offset': offset})}")
+            else:
+                endpoint = None
+
+    def iter_scheduled_drafts(self, until: Optional[str] = None,
+                              page_size: int = 50) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yield scheduled drafts in scheduled-date order.
+
+        Status and ordering are pushed to the API. Paging stops as soon as
+        a draft is scheduled after `until` (ISO 8601), so later pages are
+        never fetched.
+        """
+        horizon = _parse_datetime(until) if until else None
+        for draft in self.iter_drafts(status="scheduled", order_by="scheduled_date", page_size=page_size):
+            if draft.get("status") != "scheduled" or not draft.get("scheduled_date"):
+                continue
+            if horizon and _parse_datetime(draft["scheduled_date"]) > horizon:
+                return
+            yield draft
+
+    @timed("typefully.sync_drafts")
+    def sync_drafts(self, force: bool = False) -> None:
+        """
+        Bring the cached drafts up to date, if the cache is enabled.
+
+        Within the TTL nothing is fetched. After that only drafts updated
+        since the last sync are fetched (newest first, stopping at the
+        first unchanged one); a full resync of scheduled drafts runs on
+        the first sync, once a day, or when forced.
+        """
+        if self.cache is None:
+            return
+        state = self.cache.sync_state(self.social_set_id)
+        if not force and state and self.cache.is_fresh(state.synced_at):
+            return
+
+        started_at = time.time()
+        if force or self.cache.needs_full_sync(state):
+            drafts = list(self.iter_drafts(status="scheduled", order_by="scheduled_date"))
+            self.cache.record_sync(self.social_set_id, drafts, full=True, started_at=started_at)
+            return
+
+        from .cache import parse_timestamp  # loaded with the cache already
+
+        cursor = parse_timestamp(state.cursor)
+        # Drafts updated in the same second as the cursor may be new, so stop only
+        # strictly before it; by id, since paging can return a draft twice
+        changed: Dict[Any, Dict[str, Any]] = {}
+        for draft in self.iter_drafts(order_by="-updated_at"):
+            updated_at = parse_timestamp(draft.get("updated_at"))
+            if cursor is not None and updated_at is not None and updated_at < cursor:
+                break
+            changed.setdefault(draft.get("id"), draft)
+        self.cache.record_sync(self.social_set_id, list(changed.values()), full=False, started_at=started_at)
+
+    def list_scheduled_drafts(self, limit: Optional[int] = 20, until: Optional[str] = None,
+                              refresh: bool = False) -> List[Dict[str, Any]]:
+        """List the next `limit` scheduled drafts (None for all), sorted by scheduled date.
+
+        With a cache the drafts are served locally after an incremental sync.
+        """
+        if self.cache is not None:
+            self.sync_drafts(force=refresh)
+            return self.cache.scheduled_drafts(self.social_set_id, limit, until)
+
+        page_size = min(limit, 50) if limit else 50
+        scheduled = list(islice(self.iter_scheduled_drafts(until, page_size), limit))
+        scheduled.sort(key=lambda d: d.get("scheduled_date", ""))
+        return scheduled
+
+    def _endpoint_from_url(self, url: str) -> str:
+        """Turn a pagination URL from the API into an endpoint path for _make_request."""
+        parts = urlsplit(url)
+        path = parts.path
+        if path.startswith(self._api_path):
+            path = path[len(self._api_path):]
+        return f"{path}?{parts.query}" if parts.query else path
+
+    @timed("typefully.plan_slots")
+    def plan_slots(
+        self,
+        count: int,
+        windows: List[PostingWindow],
+        min_spacing: timedelta,
+        tz: tzinfo,
+        reserved: Iterable[datetime] = (),
+        horizon_days: int = DEFAULT_HORIZON_DAYS
+    ) -> List[str]:
+        """
+        Pick explicit publish times for a batch locally, in one pass.
+
+        Everything already scheduled within the horizon (plus `reserved`
+        times, e.g. explicit times elsewhere in the batch) is avoided by at
+        least `min_spacing`.
+
+        Returns:
+            ISO 8601 timestamps, earliest first
+
+        Raises:
+            ValueError: if the windows can't fit `count` posts within the horizon
+        """
+        now = datetime.now(tz)
+        until = (now + timedelta(days=horizon_days + 1)).isoformat()
+        taken = [_parse_datetime(draft["scheduled_date"])
+                 for draft in self.list_scheduled_drafts(None, until)]
+        planner = SlotPlanner(taken + list(reserved), windows, min_spacing, tz)
+        return [slot.isoformat() for slot in planner.plan(count, now, horizon_days)]
+
+    def schedule(
+        self,
+        content: Union[str, Sequence[str]],
+        platforms: Union[str, Iterable[str]] = "x",
+        publish_at: Optional[str] = "next-free-slot",
+        share: bool = False
+    ) -> ScheduleResult:
+        """
+        Schedule a post or thread via Typefully, or save as draft.
+
+        Args:
+            content: The post text, or a list of texts for a thread
+            platforms: "x", "linkedin", "both", or an iterable of Typefully platform names
+            publish_at: When to publish - "now", "next-free-slot", ISO 8601 datetime, or None for draft only
+            share: Whether to generate a public share URL
+
+        Returns:
+            ScheduleResult with draft details or error
+        """
+        return self.create_draft(build_draft(content, platforms, publish_at, share))
+
+    def schedule_tweet(self, text: str, publish_at: Optional[str] = "next-free-slot",
+                       share: bool = False, platform: str = "x") -> ScheduleResult:
+        """Schedule a single post on X, LinkedIn, or both."""
+        return self.schedule(text, platform, publish_at, share)
+
+    def schedule_thread(self, posts: List[str], publish_at: Optional[str] = "next-free-slot",
+                        share: bool = False) -> ScheduleResult:
+        """Schedule an X thread, one post per list item."""
+        return self.schedule(posts, "x", publish_at, share)
+
+    def schedule_post(self, text: str, publish_at: Optional[str] = "next-free-slot",
+                      share: bool = False) -> ScheduleResult:
+        """Schedule a LinkedIn post."""
+        return self.schedule(text, "linkedin", publish_at, share)
+
+    def create_draft(self, data: Dict[str, Any], social_set_id: Optional[str] = None) -> ScheduleResult:
+        """Submit one draft payload, reporting failure in the result instead of raising.
+
+        social_set_id overrides the scheduler's own social set for this draft.
+        """
+        social_set_id = social_set_id or self.social_set_id
+        try:
+            # Keyed per call, not by content: submitting the same draft twice on purpose makes two
+            response = self._make_request("POST", f"/social-sets/{social_set_id}/drafts", data)
+
+            if self.cache is not None:
+                # Write through so the next run sees the new draft without a sync
+                self.cache.upsert_drafts(social_set_id, [response])
+
+            return ScheduleResult(
+                success=True,
+                draft_id=response.get("id"),
+                status=response.get("status"),
+                scheduled_date=response.get("scheduled_date"),
+                share_url=response.get("share_url")
+            )
+        except Exception as e:
+            return ScheduleResult(success=False, error=str(e))
+
+    @timed("typefully.create_drafts")
+    def create_drafts(
+        self,
+        drafts: List[Dict[str, Any]],
+        max_concurrency: int = 4,
+        social_set_ids: Optional[List[str]] = None
+    ) -> List[ScheduleResult]:
+        """
+        Submit many draft payloads concurrently over the shared connection pool.
+
+        Args:
+            drafts: Draft payloads from build_draft()
+            max_concurrency: Maximum number of requests in flight at once
+            social_set_ids: Target social set per draft, for fanning out
+                across accounts (default: this scheduler's social set)
+
+        Returns:
+            One ScheduleResult per draft, in input order
+
+        Raises:
+            ValueError: if social_set_ids doesn't give exactly one target per draft
+        """
+        targets = social_set_ids or [self.social_set_id] * len(drafts)
+        if len(targets) != len(drafts):
+            raise ValueError(f"{len(drafts)} drafts but {len(targets)} target social sets")
+        if max_concurrency <= 1 or len(drafts) <= 1:
+            return [self.create_draft(draft, target) for draft, target in zip(drafts, targets)]
+
+        # Imported here: single-post runs never need the thread pool
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(drafts))) as executor:
+            return list(executor.map(self.create_draft, drafts, targets))
+
+
+def _parse_datetime(value: str, tz: Optional[tzinfo] = None) -> datetime:
+    """Parse an ISO 8601 timestamp, including a trailing 'Z', to an aware datetime.
+
+    A timestamp without an offset is taken to be in `tz` (default: local time),
+    so it can be compared with the API's timestamps.
+    """
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=tz) if tz else parsed.astimezone()
+    return parsed
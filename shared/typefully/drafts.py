@@ -0,0 +1,95 @@
+"""
+Typefully draft payloads and bulk manifests.
+"""
+
+import json
+import os
+from string import Template
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+
+# Platform names accepted by build_draft(), and the Typefully platforms each enables
+PLATFORMS = {
+    "x": ("x",),
+    "linkedin": ("linkedin",),
+    "both": ("x", "linkedin"),
+}
+
+
+def build_draft(
+    content: Union[str, Sequence[str]],
+    platforms: Union[str, Iterable[str]] = "x",
+    publish_at: Optional[str] = "next-free-slot",
+    share: bool = False
+) -> Dict[str, Any]:
+    """
+    Build the draft payload for a post or thread on one or more platforms.
+
+    Args:
+        content: The post text, or a list of texts for a thread
+        platforms: "x", "linkedin", "both", or an iterable of Typefully platform names
+        publish_at: When to publish - "now", "next-free-slot", ISO 8601 datetime, or None for draft only
+        share: Whether to generate a public share URL
+
+    Returns:
+        The JSON body for POST /social-sets/{id}/drafts
+    """
+    if isinstance(platforms, str):
+        platforms = PLATFORMS[platforms]
+    posts = [{"text": content}] if isinstance(content, str) else [{"text": text} for text in content]
+
+    data = {
+        "platforms": {name: {"enabled": True, "posts": posts} for name in platforms},
+        "share": share
+    }
+    if publish_at is not None:
+        data["publish_at"] = publish_at
+    return data
+
+
+def load_manifest(path: str, allow_threads: bool = True) -> List[Dict[str, Any]]:
+    """Load posts from a JSONL (one object per line) or JSON array manifest.
+
+    Entries may give their text inline or via a "file" path relative to the
+    manifest; with allow_threads, a "posts" list makes a thread, and
+    without it an entry with "posts" is rejected.
+    """
+    with open(path, "r") as f:
+        content = f.read()
+
+    if content.lstrip().startswith("["):
+        entries = json.loads(content)
+    else:
+        entries = [json.loads(line) for line in content.splitlines()
+                   if line.strip() and not line.lstrip().startswith("#")]
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    for number, entry in enumerate(entries, 1):
+        if not isinstance(entry, dict):
+            raise ValueError(f"Entry {number}: expected an object")
+        if "file" in entry and "text" not in entry:
+            with open(os.path.join(base_dir, entry["file"]), "r") as f:
+                entry["text"] = f.read().strip()
+        if allow_threads:
+            if not entry.get("text") and not entry.get("posts"):
+                raise ValueError(f"Entry {number}: needs 'text', 'posts' or 'file'")
+        elif "posts" in entry:
+            raise ValueError(f"Entry {number}: threads ('posts') aren't supported here; use 'text' or 'file'")
+        elif not entry.get("text"):
+            raise ValueError(f"Entry {number}: needs 'text' or 'file'")
+
+    return entries
+
+
+def render_for_social_set(entry: Dict[str, Any], social_set: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill $id, $name and $username in an entry's text (or thread posts) from a social set.
+
+    Unknown placeholders and stray "$" signs are left as written.
+    """
+    fields = {key: str(social_set.get(key) or "") for key in ("id", "name", "username")}
+    rendered = dict(entry)
+    if entry.get("text"):
+        rendered["text"] = Template(entry["text"]).safe_substitute(fields)
+    if entry.get("posts"):
+        rendered["posts"] = [Template(text).safe_substitute(fields) for text in entry["posts"]]
+    return rendered
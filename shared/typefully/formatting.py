@@ -0,0 +1,140 @@
+"""
+Display formatting for the Typefully CLIs.
+"""
+
+from typing import Any, Dict, List, Tuple
+
+from .client import ScheduleResult
+
+
+def format_result(result: ScheduleResult, noun: str = "post") -> str:
+    """Format a schedule result for display; noun names the post, e.g. "tweet"."""
+    title = noun[0].upper() + noun[1:]
+    lines = []
+
+    if result.success:
+        if result.status == "draft":
+            lines.append(f"{title} saved as draft in Typefully")
+        else:
+            lines.append(f"{title} scheduled successfully")
+        if result.draft_id:
+            lines.append(f"   Draft ID: {result.draft_id}")
+        if result.status:
+            lines.append(f"   Status: {result.status}")
+        if result.scheduled_date:
+            lines.append(f"   Scheduled: {result.scheduled_date}")
+        if result.share_url:
+            lines.append(f"   Share URL: {result.share_url}")
+    else:
+        lines.append(f"Failed to schedule {noun}")
+        if result.error:
+            lines.append(f"   Error: {result.error}")
+
+    return "\n".join(lines)
+
+
+def format_social_sets(social_sets: List[Dict[str, Any]]) -> str:
+    """Format social sets for display."""
+    if not social_sets:
+        return "No social sets found."
+
+    lines = ["Available Social Sets:\n"]
+    for ss in social_sets:
+        lines.append(f"   ID: {ss.get('id')}")
+        lines.append(f"   Name: {ss.get('name', 'Unnamed')}")
+        if ss.get('username'):
+            lines.append(f"   Username: @{ss.get('username')}")
+        lines.append("")
+
+    return "\n".join(lines)
+
+
+def format_social_set_details(details: Dict[str, Any]) -> str:
+    """Format social set details for display."""
+    lines = [f"Social Set: {details.get('name', 'Unnamed')} (ID: {details.get('id')})\n"]
+    lines.append("Connected Platforms:")
+
+    platforms = details.get("platforms", {})
+    for name, info in platforms.items():
+        if info:
+            display_name = "X/Twitter" if name == "x" else name.title()
+            lines.append(f"   {display_name}: @{info.get('username')} - {info.get('profile_url')}")
+
+    return "\n".join(lines)
+
+
+def format_scheduled_drafts(drafts: List[Dict[str, Any]]) -> str:
+    """Format scheduled drafts for display."""
+    if not drafts:
+        return "No posts currently scheduled."
+
+    lines = ["Currently scheduled posts:\n"]
+    for draft in drafts:
+        scheduled = draft.get("scheduled_date", "Unknown")
+        preview = draft.get("preview", "")[:50]
+        if len(draft.get("preview", "")) > 50:
+            preview += "..."
+
+        platforms = []
+        if draft.get("x_post_enabled"):
+            platforms.append("X")
+        if draft.get("linkedin_post_enabled"):
+            platforms.append("LinkedIn")
+        platform_str = ", ".join(platforms) if platforms else "Unknown"
+
+        lines.append(f"  {scheduled}  [{platform_str}]")
+        lines.append(f"    {preview}")
+        lines.append("")
+
+    return "\n".join(lines)
+
+
+def format_manifest_summary(entries: List[Dict[str, Any]], results: List[ScheduleResult]) -> str:
+    """Format a per-post summary table for a manifest run."""
+    lines = [f"{'#':>3}  {'Result':<10} {'Scheduled':<26} {'Draft ID':<10} Preview / Error"]
+
+    for number, (entry, result) in enumerate(zip(entries, results), 1):
+        if result.success:
+            text = entry.get("text") or " / ".join(entry.get("posts", []))
+            detail = text.replace("\n", " ")[:40] + ("..." if len(text) > 40 else "")
+            lines.append(f"{number:>3}  {result.status or 'ok':<10} {result.scheduled_date or '-':<26} "
+                         f"{str(result.draft_id or '-'):<10} {detail}")
+        else:
+            lines.append(f"{number:>3}  {'FAILED':<10} {'-':<26} {'-':<10} {result.error}")
+
+    succeeded = sum(1 for result in results if result.success)
+    lines.append("")
+    lines.append(f"{succeeded} succeeded, {len(results) - succeeded} failed")
+    return "\n".join(lines)
+
+
+def format_fanout_summary(rows: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+                          results: List[ScheduleResult]) -> str:
+    """Format one report for posts fanned out to several social sets.
+
+    rows holds a (social set, manifest entry) pair per submitted draft.
+    """
+    lines = [f"{'Social set':<24} {'Result':<10} {'Scheduled':<26} {'Draft ID':<10} Preview / Error"]
+
+    per_set: Dict[str, List[int]] = {}
+    for (social_set, entry), result in zip(rows, results):
+        label = social_set.get("name") or social_set.get("username") or str(social_set.get("id"))
+        label = f"{label[:16]} ({social_set.get('id')})"
+        counts = per_set.setdefault(label, [0, 0])
+        counts[0 if result.success else 1] += 1
+
+        if result.success:
+            text = entry.get("text") or " / ".join(entry.get("posts", []))
+            detail = text.replace("\n", " ")[:40] + ("..." if len(text) > 40 else "")
+            lines.append(f"{label:<24} {result.status or 'ok':<10} {result.scheduled_date or '-':<26} "
+                         f"{str(result.draft_id or '-'):<10} {detail}")
+        else:
+            lines.append(f"{label:<24} {'FAILED':<10} {'-':<26} {'-':<10} {result.error}")
+
+    succeeded = sum(1 for result in results if result.success)
+    failed_sets = [label for label, (_, failed) in per_set.items() if failed]
+    lines.append("")
+    lines.append(f"{succeeded} succeeded, {len(results) - succeeded} failed across {len(per_set)} social sets")
+    if failed_sets:
+        lines.append(f"Social sets with failures: {', '.join(failed_sets)}")
+    return "\n".join(lines)
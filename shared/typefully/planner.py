@@ -0,0 +1,174 @@
+"""
+Slot Planner
+
+Assigns explicit publish times to a batch of posts locally, instead of
+asking the Typefully API for "next-free-slot" once per post.
+
+Already-scheduled posts are kept in a sorted index; each post blocks the
+minimum spacing on either side of it. Slots are handed out in one pass,
+earliest first, inside the configured posting windows.
+
+Windows are written in local wall-clock time but all comparisons and
+spacing happen in UTC, so DST changes never produce a nonexistent slot or
+two slots at the same instant.
+"""
+
+import re
+from bisect import bisect_right, insort
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from typing import FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+WEEKDAY_GROUPS = {
+    "daily": range(7),
+    "weekdays": range(5),
+    "weekends": range(5, 7),
+}
+WINDOW_PATTERN = re.compile(r"^\s*(?:(?P<days>[a-z,\-]+)\s+)?(?P<start>\d{1,2}:\d{2})\s*-\s*(?P<end>\d{1,2}:\d{2})\s*$")
+
+DEFAULT_HORIZON_DAYS = 90
+
+
+@dataclass(frozen=True)
+class PostingWindow:
+    """A daily time range, on some weekdays, when posts may go out."""
+    weekdays: FrozenSet[int]
+    start: time
+    end: time
+
+    @classmethod
+    def parse(cls, spec: str) -> "PostingWindow":
+        """Parse a window like "09:00-11:00", "mon-fri 09:00-17:00" or "sat,sun 10:00-12:00"."""
+        match = WINDOW_PATTERN.match(spec.lower())
+        if not match:
+            raise ValueError(f"Invalid posting window: {spec!r} (expected e.g. 'mon-fri 09:00-17:00')")
+
+        start = time.fromisoformat(match["start"].zfill(5))
+        end = time.fromisoformat(match["end"].zfill(5))
+        if end <= start:
+            raise ValueError(f"Invalid posting window: {spec!r} (end must be after start)")
+        return cls(_parse_weekdays(match["days"] or "daily"), start, end)
+
+
+def _parse_weekdays(spec: str) -> FrozenSet[int]:
+    days = set()
+    for part in spec.split(","):
+        if part in WEEKDAY_GROUPS:
+            days.update(WEEKDAY_GROUPS[part])
+        elif "-" in part:
+            first, last = (_weekday_index(day) for day in part.split("-", 1))
+            days.update(day % 7 for day in range(first, first + (last - first) % 7 + 1))
+        else:
+            days.add(_weekday_index(part))
+    return frozenset(days)
+
+
+def _weekday_index(name: str) -> int:
+    try:
+        return WEEKDAYS.index(name[:3])
+    except ValueError:
+        raise ValueError(f"Unknown weekday: {name!r}") from None
+
+
+class SlotPlanner:
+    """
+    Earliest-fit placement of new posts around an existing schedule.
+
+    Args:
+        scheduled: Publish times already taken (timezone-aware)
+        windows: When posts may go out, in `tz`
+        min_spacing: Minimum gap between any two posts
+        tz: Timezone the windows are expressed in
+        granularity: Planned times are rounded up to a multiple of this
+    """
+
+    def __init__(
+        self,
+        scheduled: Iterable[datetime],
+        windows: List[PostingWindow],
+        min_spacing: timedelta,
+        tz: tzinfo,
+        granularity: timedelta = timedelta(minutes=5)
+    ):
+        if not windows:
+            raise ValueError("At least one posting window is required")
+        if min_spacing <= timedelta(0):
+            raise ValueError("Minimum spacing must be positive")
+        self.windows = windows
+        self.min_spacing = min_spacing
+        self.tz = tz
+        self.granularity = granularity
+        self._taken = sorted(moment.astimezone(timezone.utc) for moment in scheduled)
+
+    def plan(self, count: int, start: Optional[datetime] = None,
+             horizon_days: int = DEFAULT_HORIZON_DAYS) -> List[datetime]:
+        """
+        Assign `count` publish times, in order, no earlier than `start` (default: now).
+
+        Window ends are exclusive: "09:00-12:00" plans nothing at 12:00.
+        Planned times are returned in the planner's timezone.
+
+        Raises:
+            ValueError: if the windows within the horizon can't fit every post
+        """
+        start = (start or datetime.now(timezone.utc)).astimezone(timezone.utc)
+        planned: List[datetime] = []
+        ranges = self._window_ranges(start.astimezone(self.tz).date(), horizon_days)
+
+        window_start, window_end = next(ranges, (None, None))
+        cursor = start
+        while len(planned) < count:
+            if window_start is None:
+                raise ValueError(f"Only {len(planned)} of {count} posts fit in the posting windows "
+                                 f"over the next {horizon_days} days")
+
+            candidate = self._next_free(self._round_up(max(cursor, window_start)))
+            if candidate >= window_end:
+                window_start, window_end = next(ranges, (None, None))
+                continue
+
+            planned.append(candidate)
+            insort(self._taken, candidate)
+            cursor = candidate
+
+        return [moment.astimezone(self.tz) for moment in planned]
+
+    def _next_free(self, candidate: datetime) -> datetime:
+        """Move the candidate past every post closer than the minimum spacing."""
+        while True:
+            # First post after (candidate - spacing); it conflicts if it is
+            # also before (candidate + spacing)
+            index = bisect_right(self._taken, candidate - self.min_spacing)
+            if index == len(self._taken) or self._taken[index] >= candidate + self.min_spacing:
+                return candidate
+            candidate = self._round_up(self._taken[index] + self.min_spacing)
+
+    def _window_ranges(self, first_day: date, days: int) -> Iterator[Tuple[datetime, datetime]]:
+        """Yield (start, end) of each window occurrence as UTC instants, in chronological order."""
+        for offset in range(days):
+            day = first_day + timedelta(days=offset)
+            occurrences = sorted(
+                (self._instant(day, window.start), self._instant(day, window.end))
+                for window in self.windows if day.weekday() in window.weekdays
+            )
+            yield from occurrences
+
+    def _instant(self, day: date, wall_time: time) -> datetime:
+        """A local wall-clock time as a UTC instant.
+
+        A time skipped by a DST change lands just after the gap (02:30 becomes
+        03:30); a repeated time means its first occurrence.
+        """
+        return datetime.combine(day, wall_time, self.tz).astimezone(timezone.utc)
+
+    def _round_up(self, moment: datetime) -> datetime:
+        """Round a UTC instant up to the granularity, counted from local midnight."""
+        step = self.granularity.total_seconds()
+        if step <= 0:
+            return moment
+        midnight = self._instant(moment.astimezone(self.tz).date(), time(0))
+        elapsed = (moment - midnight).total_seconds()
+        remainder = elapsed % step
+        return moment if remainder == 0 else moment + timedelta(seconds=step - remainder)
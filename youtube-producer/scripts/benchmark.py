@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+YouTube Producer Benchmarks
+Measures analyzer throughput and peak memory on synthetic corpora
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Recorded with the results; the analyzers fall back to pure Python
+    np = None
+
+from hook_analyzer import HookAnalyzer
+from shorts_extractor import ShortsExtractor
+from title_generator import TitleGenerator
+
+DEFAULT_SCALES = (1_000, 10_000, 100_000)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+DEFAULT_TOLERANCE = 0.25  # allowed slowdown or memory growth before a result counts as a regression
+SEED = 1234
+
+# Fixed vocabulary, independent of the analyzers' lexicons, so the corpora
+# stay the same when the lexicons grow and a slowdown shows up as such
+FILLER_WORDS = (
+    'the', 'a', 'to', 'and', 'of', 'in', 'this', 'that', 'it', 'for', 'with', 'on',
+    'video', 'code', 'build', 'test', 'tool', 'app', 'data', 'week', 'team', 'money',
+    'people', 'work', 'time', 'result', 'project', 'idea', 'way', 'thing', 'day'
+)
+HOOK_PHRASES = (
+    'what if', 'have you ever', 'most people', 'nobody talks about', 'bet you',
+    'years ago', 'changes everything', "i'll show you", 'by the end', 'secret',
+    'shocking', 'actually', 'hidden', 'basically', 'kind of', 'maybe', 'destroy',
+    'biggest mistake', 'costs you', 'but', 'however', 'then something', 'you', 'my'
+)
+OUTLINE_PHRASES = (
+    'most people think', 'the truth is', 'pro tip', "here's how", 'the result',
+    'it turns out', 'step by step', 'how to', 'story time', 'let me tell you',
+    'versus', 'compared to', 'myth', 'common mistake', 'behind the scenes', 'blooper',
+    'costs $500', 'saves 40%', 'why does this work?'
+)
+TOPIC_WORDS = (
+    'Python', 'Rust', 'SQLite', 'Postgres', 'Docker', 'Kubernetes', 'React', 'Laravel',
+    'Email Marketing', 'SEO', 'Woodworking', 'Home Lab', 'Budgeting', 'Sourdough',
+    'Productivity', 'AI Agents', 'Excel', 'Photography', 'Running', 'Chess'
+)
+
+@dataclass
+class BenchmarkResult:
+    """Throughput and peak memory of one case at one scale"""
+    case: str
+    scale: int
+    seconds: float
+    throughput: float
+    peak_bytes: int
+
+def generate_hooks(count: int, rng: random.Random) -> List[str]:
+    """Synthetic hooks of 5-100 words, about one in five words a hook phrase"""
+    
+    hooks = []
+    for _ in range(count):
+        words = [rng.choice(HOOK_PHRASES) if rng.random() < 0.2 else rng.choice(FILLER_WORDS)
+                 for _ in range(rng.randint(5, 100))]
+        if rng.random() < 0.3:
+            words.append(str(rng.randint(2, 99)))
+        hook = ' '.join(words)
+        hooks.append(hook.capitalize() + ('?' if rng.random() < 0.3 else '.'))
+    return hooks
+
+def generate_outline(sections: int, rng: random.Random) -> str:
+    """A synthetic video outline with the given number of sections"""
+    
+    lines = []
+    for number in range(1, sections + 1):
+        lines.append(rng.choice(('#', '##', '###')) + f' Section {number}')
+        for _ in range(rng.randint(2, 6)):
+            words = [rng.choice(FILLER_WORDS) for _ in range(rng.randint(6, 20))]
+            if rng.random() < 0.4:
+                words.insert(rng.randrange(len(words)), rng.choice(OUTLINE_PHRASES))
+            lines.append(' '.join(words))
+        lines.append('')
+    return '\n'.join(lines)
+
+def generate_topics(count: int, rng: random.Random) -> List[str]:
+    """Synthetic one- to three-word video topics"""
+    
+    return [' '.join(rng.sample(TOPIC_WORDS, rng.randint(1, 3))) for _ in range(count)]
+
+def _analyze_hooks(scale: int) -> Tuple[Callable[[], object], int]:
+    analyzer = HookAnalyzer()
+    hooks = generate_hooks(scale, random.Random(SEED))
+    return (lambda: [analyzer.analyze_hook(hook) for hook in hooks]), scale
+
+def _compare_hooks(scale: int) -> Tuple[Callable[[], object], int]:
+    analyzer = HookAnalyzer()
+    hooks = generate_hooks(scale, random.Random(SEED))
+    return (lambda: analyzer.compare_hooks(hooks)), scale
+
+def _extract_shorts(scale: int) -> Tuple[Callable[[], object], int]:
+    extractor = ShortsExtractor()
+    outline = generate_outline(scale, random.Random(SEED))
+    return (lambda: extractor.extract_shorts(outline)), scale
+
+def _generate_titles(scale: int) -> Tuple[Callable[[], object], int]:
+    generator = TitleGenerator()
+    # Ten titles per topic, as the CLI generates them
+    topics = generate_topics(math.ceil(scale / 10), random.Random(SEED))
+    call = lambda: [generator.generate_with_metrics(topic, seed=SEED, count=10) for topic in topics]
+    return call, len(topics) * 10
+
+# Case name -> setup(scale) returning (the call to measure, items it processes)
+CASES: Dict[str, Callable[[int], Tuple[Callable[[], object], int]]] = {
+    'hook.analyze_hook': _analyze_hooks,
+    'hook.compare_hooks': _compare_hooks,
+    'shorts.extract_shorts': _extract_shorts,
+    'titles.generate_with_metrics': _generate_titles,
+}
+
+def run_case(case: str, scale: int, repeat: int = 3) -> BenchmarkResult:
+    """Time the best of `repeat` runs, then measure peak memory in one more"""
+    
+    call, items = CASES[case](scale)
+    
+    best = math.inf
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        best = min(best, time.perf_counter() - started)
+    
+    # Traced separately: tracemalloc slows the code it watches
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    return BenchmarkResult(case=case, scale=scale, seconds=best,
+                           throughput=items / max(best, 1e-9), peak_bytes=peak)
+
+def environment() -> Dict[str, object]:
+    """What the results depend on besides the code"""
+    
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'system': platform.system(),
+        'numpy': np.__version__ if np is not None else None
+    }
+
+def result_key(result: BenchmarkResult) -> str:
+    return f'{result.case}@{result.scale}'
+
+def load_baseline(path: str) -> Optional[Dict[str, object]]:
+    """Load a stored baseline, or None if there isn't one"""
+    
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def save_baseline(path: str, results: Sequence[BenchmarkResult]) -> None:
+    """Store results as the baseline, keeping entries for cases and scales not re-run"""
+    
+    baseline = load_baseline(path) or {}
+    stored = baseline.get('results', {})
+    stored.update({result_key(result): asdict(result) for result in results})
+    
+    with open(path, 'w') as f:
+        json.dump({'environment': environment(), 'results': dict(sorted(stored.items()))}, f, indent=2)
+        f.write('\n')
+
+def compare(result: BenchmarkResult, baseline: Optional[Dict[str, object]],
+            tolerance: float) -> Tuple[str, bool]:
+    """Describe a result against its baseline entry; True if it regressed"""
+    
+    entry = (baseline or {}).get('results', {}).get(result_key(result))
+    if entry is None:
+        return 'no baseline', False
+    
+    speed = result.throughput / entry['throughput'] - 1
+    memory = result.peak_bytes / max(entry['peak_bytes'], 1) - 1
+    slower = speed < -tolerance
+    bigger = memory > tolerance
+    
+    text = f'{speed:+.0%} speed, {memory:+.0%} memory'
+    if slower or bigger:
+        text += '  REGRESSION'
+    return text, slower or bigger
+
+def format_results(rows: List[Tuple[BenchmarkResult, str]]) -> str:
+    """Format results as a table"""
+    
+    lines = [f"{'Case':<30} {'Scale':>8} {'Items/s':>12} {'Peak MB':>9}  vs baseline"]
+    for result, comparison in rows:
+        lines.append(f'{result.case:<30} {result.scale:>8,} {result.throughput:>12,.0f} '
+                     f'{result.peak_bytes / 1_000_000:>9.2f}  {comparison}')
+    return '\n'.join(lines)
+
+def parse_scales(text: str) -> List[int]:
+    """Parse '1000,10k,0.1m' into integers"""
+    
+    multipliers = {'k': 1_000, 'm': 1_000_000}
+    scales = []
+    for part in text.split(','):
+        part = part.strip().lower()
+        multiplier = multipliers.get(part[-1:], 1)
+        scales.append(int(float(part.rstrip('km')) * multiplier))
+    return scales
+
+def main():
+    """Run the benchmarks and compare them against the stored baseline"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the youtube-producer analyzers on synthetic corpora",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s                                   # All cases at 1k/10k/100k, compared to the baseline
+  %(prog)s --cases hook.analyze_hook --scales 10k
+  %(prog)s --save-baseline                   # Record these results as the new baseline
+        """
+    )
+    parser.add_argument('--cases', default=','.join(CASES),
+                        help=f"Comma-separated cases (default: all of {', '.join(CASES)})")
+    parser.add_argument('--scales', type=parse_scales, default=list(DEFAULT_SCALES),
+                        help="Comma-separated corpus sizes, e.g. 1k,10k,100k (default)")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per case, best kept (default: 3)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help="Baseline JSON to compare against (default: benchmark_baseline.json)")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown or memory growth, as a fraction (default: 0.25)")
+    parser.add_argument('--save-baseline', action='store_true', help="Store these results as the baseline")
+    parser.add_argument('--json', help="Also write the results to this JSON file")
+    
+    args = parser.parse_args()
+    
+    cases = [case.strip() for case in args.cases.split(',') if case.strip()]
+    unknown = [case for case in cases if case not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}")
+    
+    baseline = None if args.save_baseline else load_baseline(args.baseline)
+    if baseline and baseline.get('environment') != environment():
+        print(f"Warning: baseline was recorded on {baseline.get('environment')}, "
+              f"not {environment()}; expect differences", file=sys.stderr)
+    
+    interactive = sys.stderr.isatty()
+    rows = []
+    regressed = False
+    for case in cases:
+        for scale in args.scales:
+            if interactive:
+                print(f"\rRunning {case} @ {scale:,}...".ljust(60), end='', file=sys.stderr, flush=True)
+            result = run_case(case, scale, args.repeat)
+            comparison, worse = compare(result, baseline, args.tolerance)
+            regressed = regressed or worse
+            rows.append((result, comparison))
+    if interactive:
+        print('\r'.ljust(61), end='\r', file=sys.stderr)
+    
+    print(format_results(rows))
+    
+    results = [result for result, _ in rows]
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'environment': environment(), 'results': [asdict(result) for result in results]}, f, indent=2)
+    
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"\nBaseline saved to {args.baseline}")
+    elif regressed:
+        print(f"\nRegressed by more than {args.tolerance:.0%} against {args.baseline}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
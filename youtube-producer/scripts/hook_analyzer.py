@@ -4,9 +4,43 @@ YouTube Hook Analyzer
 Evaluates the effectiveness of video hooks
 """
 
+import argparse
+import csv
+import json
+import os
 import re
-from typing import Dict, List, Tuple
-from dataclasses import dataclass
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Batch scoring falls back to pure Python
+    np = None
+
+import instrumentation
+from instrumentation import count, timed
+from phrase_index import PhraseIndex
+from ranking import top_indices
+
+LEXICONS = ('power', 'weak', 'stakes', 'curiosity')
+
+# Columns of the batch feature matrix, in order
+FEATURES = (
+    'word_count', 'power', 'weak', 'stakes', 'curiosity',
+    'question', 'number', 'interrupt', 'promise', 'personal'
+)
+
+# Attributes a --lexicons file may override
+LEXICON_ATTRIBUTES = (
+    'hook_patterns', 'power_words', 'weak_words', 'stakes_words', 'curiosity_phrases'
+)
+
+SPECIFICITY_PATTERN = re.compile(r'\d+')
+PERSONAL_PATTERN = re.compile(r'\b(i|my|me|you|your)\b')
 
 @dataclass
 class HookAnalysis:
@@ -40,18 +74,67 @@ class HookAnalyzer:
             'basically', 'sort of', 'kind of', 'maybe', 'possibly',
             'might', 'could', 'somewhat', 'fairly', 'quite'
         ]
+        
+        self.stakes_words = [
+            'destroy', 'ruin', 'change everything', 'never be the same',
+            'biggest mistake', 'costs you', 'loses'
+        ]
+        
+        self.curiosity_phrases = [
+            'but', 'however', 'except', 'until', 'then something'
+        ]
+        
+        self.compile_lexicons()
+    
+    def compile_lexicons(self) -> None:
+        """Precompile hook patterns and lexicons into a single-pass matcher.
+        
+        Call again after editing any of the pattern or lexicon attributes.
+        """
+        
+        self._compiled_patterns = {
+            hook_type: re.compile(pattern)
+            for hook_type, pattern in self.hook_patterns.items()
+        }
+        
+        lexicons = {
+            'power': self.power_words,
+            'weak': self.weak_words,
+            'stakes': self.stakes_words,
+            'curiosity': self.curiosity_phrases
+        }
+        
+        # A phrase may belong to several lexicons (e.g. 'destroy')
+        self._phrase_lexicons: Dict[str, List[str]] = {}
+        for lexicon, phrases in lexicons.items():
+            for phrase in phrases:
+                self._phrase_lexicons.setdefault(phrase.lower(), []).append(lexicon)
+        
+        self._lexicon_index = PhraseIndex(self._phrase_lexicons)
+    
+    def _count_lexicon_hits(self, lower_text: str) -> Dict[str, int]:
+        """Count distinct phrases from each lexicon found in the text"""
+        
+        counts = dict.fromkeys(LEXICONS, 0)
+        for phrase in self._lexicon_index.found(lower_text):
+            for lexicon in self._phrase_lexicons[phrase]:
+                counts[lexicon] += 1
+        return counts
     
+    @timed('hook.analyze')
     def analyze_hook(self, hook_text: str, target_length_seconds: int = 30) -> HookAnalysis:
         """Analyze a hook for effectiveness"""
         
         hook_text = hook_text.strip()
+        lower_text = hook_text.lower()
+        lexicon_hits = self._count_lexicon_hits(lower_text)
         score = 0
         strengths = []
         weaknesses = []
         suggestions = []
         
         # Detect hook type
-        hook_type = self._detect_hook_type(hook_text)
+        hook_type = self._detect_hook_type(lower_text)
         
         # Length analysis (assuming ~2.5 words per second speaking rate)
         word_count = len(hook_text.split())
@@ -68,8 +151,7 @@ class HookAnalyzer:
             score += 10
         
         # Check for power words
-        power_word_count = sum(1 for word in self.power_words 
-                              if word.lower() in hook_text.lower())
+        power_word_count = lexicon_hits['power']
         if power_word_count > 0:
             strengths.append(f"Uses {power_word_count} power word(s)")
             score += power_word_count * 5
@@ -77,8 +159,7 @@ class HookAnalyzer:
             suggestions.append("Add power words for emotional impact")
         
         # Check for weak words
-        weak_word_count = sum(1 for word in self.weak_words 
-                            if word.lower() in hook_text.lower())
+        weak_word_count = lexicon_hits['weak']
         if weak_word_count > 0:
             weaknesses.append(f"Contains {weak_word_count} weak qualifier(s)")
             suggestions.append("Remove weak qualifiers for stronger statements")
@@ -90,7 +171,7 @@ class HookAnalyzer:
             score += 10
         
         # Promise/value check
-        if re.search(self.hook_patterns['promise'], hook_text.lower()):
+        if self._compiled_patterns['promise'].search(lower_text):
             strengths.append("Makes clear promise to viewer")
             score += 15
         else:
@@ -102,27 +183,24 @@ class HookAnalyzer:
             score += 10
         
         # Specificity check
-        if re.search(r'\d+', hook_text):
+        if SPECIFICITY_PATTERN.search(hook_text):
             strengths.append("Includes specific numbers")
             score += 10
         
         # Stakes/consequences check
-        stakes_words = ['destroy', 'ruin', 'change everything', 'never be the same', 
-                       'biggest mistake', 'costs you', 'loses']
-        if any(word in hook_text.lower() for word in stakes_words):
+        if lexicon_hits['stakes']:
             strengths.append("Establishes clear stakes")
             score += 15
         else:
             suggestions.append("Consider adding stakes or consequences")
         
         # Curiosity gap check
-        curiosity_phrases = ['but', 'however', 'except', 'until', 'then something']
-        if any(phrase in hook_text.lower() for phrase in curiosity_phrases):
+        if lexicon_hits['curiosity']:
             strengths.append("Creates curiosity gap")
             score += 15
         
         # Personal/relatable check
-        if re.search(r'\b(i|my|me|you|your)\b', hook_text.lower()):
+        if PERSONAL_PATTERN.search(lower_text):
             strengths.append("Uses personal/direct language")
             score += 10
         
@@ -149,13 +227,11 @@ class HookAnalyzer:
             estimated_retention=estimated_retention
         )
     
-    def _detect_hook_type(self, hook_text: str) -> str:
-        """Detect the type of hook being used"""
-        
-        lower_text = hook_text.lower()
+    def _detect_hook_type(self, lower_text: str) -> str:
+        """Detect the type of hook being used from the lowercased hook"""
         
-        for hook_type, pattern in self.hook_patterns.items():
-            if re.search(pattern, lower_text):
+        for hook_type, pattern in self._compiled_patterns.items():
+            if pattern.search(lower_text):
                 return hook_type.capitalize()
         
         return "General"
@@ -172,6 +248,80 @@ class HookAnalyzer:
         
         return analyses
     
+    def analyze_batch(self, hooks: Sequence[str], target_length_seconds: int = 30,
+                      top_k: int = 5) -> List[HookAnalysis]:
+        """Rank many hooks and fully analyze only the top_k.
+        
+        Same scores and ordering as compare_hooks, but the strengths,
+        weaknesses and suggestions are only built for the hooks returned.
+        """
+        
+        scores = self._batch_scores(hooks, target_length_seconds)
+        return [self.analyze_hook(hooks[i], target_length_seconds)
+                for i in self._top_indices(scores, top_k)]
+    
+    def score_batch(self, hooks: Sequence[str], target_length_seconds: int = 30) -> List[int]:
+        """Score hooks without building any analysis text"""
+        
+        scores = self._batch_scores(hooks, target_length_seconds)
+        return scores.tolist() if np is not None else scores
+    
+    @timed('hook.features')
+    def feature_matrix(self, hooks: Sequence[str]):
+        """Extract one row of FEATURES per hook (NumPy array if available)"""
+        
+        rows = [self._extract_features(hook) for hook in hooks]
+        if np is None:
+            return rows
+        return np.array(rows, dtype=np.int32).reshape(len(rows), len(FEATURES))
+    
+    def _extract_features(self, hook_text: str) -> Tuple[int, ...]:
+        """Extract the scoring inputs analyze_hook uses, as integers"""
+        
+        hook_text = hook_text.strip()
+        lower_text = hook_text.lower()
+        lexicon_hits = self._count_lexicon_hits(lower_text)
+        
+        return (
+            len(hook_text.split()),
+            lexicon_hits['power'],
+            lexicon_hits['weak'],
+            lexicon_hits['stakes'],
+            lexicon_hits['curiosity'],
+            int('?' in hook_text),
+            int(SPECIFICITY_PATTERN.search(hook_text) is not None),
+            int(hook_text[:1].islower() or hook_text.startswith('...')),
+            int(self._compiled_patterns['promise'].search(lower_text) is not None),
+            int(PERSONAL_PATTERN.search(lower_text) is not None)
+        )
+    
+    @staticmethod
+    def _score_columns(columns, target_length_seconds: int):
+        """Apply the analyze_hook weights to scalars or whole NumPy columns"""
+        
+        (word_count, power, weak, stakes, curiosity,
+         question, number, interrupt, promise, personal) = columns
+        expected_words = target_length_seconds * 2.5
+        good_length = (word_count >= expected_words * 0.7) & (word_count <= expected_words * 1.3)
+        
+        return (10 * good_length + 5 * power - 3 * weak + 10 * interrupt
+                + 15 * promise + 10 * question + 10 * number
+                + 15 * (stakes > 0) + 15 * (curiosity > 0) + 10 * personal)
+    
+    def _batch_scores(self, hooks: Sequence[str], target_length_seconds: int):
+        """Score every hook, vectorized over the feature matrix when possible"""
+        
+        features = self.feature_matrix(hooks)
+        
+        if np is None:
+            return [max(0, min(100, int(self._score_columns(row, target_length_seconds))))
+                    for row in features]
+        
+        raw = self._score_columns(features.T, target_length_seconds)
+        return np.clip(raw, 0, 100)
+    
+    _top_indices = staticmethod(timed('hook.rank')(top_indices))
+    
     def suggest_improvements(self, hook_text: str) -> str:
         """Generate an improved version of the hook"""
         
@@ -222,8 +372,258 @@ def format_analysis(analysis: HookAnalysis) -> str:
     
     return "\n".join(output)
 
+def load_lexicons(path: str) -> Dict[str, Any]:
+    """Load lexicon overrides from a JSON file keyed by analyzer attribute"""
+    
+    with open(path) as f:
+        lexicons = json.load(f)
+    
+    unknown = set(lexicons) - set(LEXICON_ATTRIBUTES)
+    if unknown:
+        raise ValueError(f"Unknown lexicon(s): {', '.join(sorted(unknown))}")
+    
+    return lexicons
+
+def _jsonl_records(source: Iterable[str],
+                   reject: Callable[[int, str], None]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield (line_number, record) for each JSON object line, rejecting the rest"""
+    
+    for number, line in enumerate(source, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            reject(number, f"invalid JSON ({e.msg})")
+            continue
+        if not isinstance(record, dict):
+            reject(number, f"expected a JSON object, got {type(record).__name__}")
+            continue
+        yield number, record
+
+def read_hooks(source: Iterable[str], input_format: str, field: Optional[str] = None,
+               on_error: Optional[Callable[[int, str], None]] = None) -> Iterator[Tuple[Dict[str, Any], str]]:
+    """Yield (extra_fields, hook_text) from JSONL, CSV or plain-text lines
+    
+    A JSONL line that isn't a JSON object, or a record whose hook isn't
+    text, is skipped after calling on_error(line_number, message); without
+    on_error it raises ValueError instead.
+    """
+    
+    def reject(number: int, message: str) -> None:
+        if on_error is None:
+            raise ValueError(f"Line {number}: {message}")
+        on_error(number, message)
+    
+    if input_format == 'csv':
+        reader = csv.DictReader(source)
+        records: Iterable[Tuple[int, Any]] = ((reader.line_num, record) for record in reader)
+    elif input_format == 'jsonl':
+        records = _jsonl_records(source, reject)
+    else:
+        records = ((number, line.rstrip('\n')) for number, line in enumerate(source, 1) if line.strip())
+    
+    for number, record in records:
+        if isinstance(record, str):
+            yield {}, record
+            continue
+        
+        key = field or ('hook' if 'hook' in record else 'text')
+        text = record.get(key)
+        if text is not None and not isinstance(text, str):
+            reject(number, f"'{key}' is {type(text).__name__}, not text")
+            continue
+        extra = {k: v for k, v in record.items() if k != key}
+        yield extra, text or ''
+
+_worker_analyzer: Optional['HookAnalyzer'] = None
+
+def _init_worker(lexicons: Optional[Dict[str, Any]]) -> None:
+    """Build the one HookAnalyzer each worker process reuses"""
+    
+    global _worker_analyzer
+    _worker_analyzer = HookAnalyzer()
+    if lexicons:
+        for name, value in lexicons.items():
+            setattr(_worker_analyzer, name, value)
+        _worker_analyzer.compile_lexicons()
+
+@timed('hook.read_chunk')
+def _read_chunk(hooks: Iterator[Tuple[Dict[str, Any], str]], chunk_size: int) -> List[Tuple[Dict[str, Any], str]]:
+    """Pull the next chunk of hooks from the input stream"""
+    
+    return list(islice(hooks, chunk_size))
+
+@timed('hook.score_chunk')
+def _score_chunk(chunk: List[Tuple[Dict[str, Any], str]], target_length_seconds: int,
+                 scores_only: bool) -> List[str]:
+    """Score one chunk of hooks in a worker, returning JSON lines"""
+    
+    analyzer = _worker_analyzer
+    texts = [text.strip() for _, text in chunk]
+    lines = []
+    
+    if scores_only:
+        scores = analyzer.score_batch(texts, target_length_seconds)
+    
+    for i, (extra, text) in enumerate(chunk):
+        if not texts[i]:
+            result = {**extra, 'text': text, 'error': 'Empty hook'}
+        elif scores_only:
+            result = {**extra, 'text': texts[i], 'score': scores[i]}
+        else:
+            result = {**extra, **asdict(analyzer.analyze_hook(text, target_length_seconds))}
+        lines.append(json.dumps(result, ensure_ascii=False))
+    
+    count('hook.hooks_scored', len(chunk))
+    return lines
+
+def _submit_chunk(pool: ProcessPoolExecutor, chunk: List[Tuple[Dict[str, Any], str]],
+                  target_length_seconds: int, scores_only: bool):
+    """Queue a chunk on a worker, bringing back its timings when instrumented"""
+    
+    if instrumentation.ENABLED:
+        return pool.submit(instrumentation.run_recorded, _score_chunk, chunk,
+                           target_length_seconds, scores_only)
+    return pool.submit(_score_chunk, chunk, target_length_seconds, scores_only)
+
+def _chunk_result(future) -> List[str]:
+    """A chunk's JSON lines, merging any worker timings into this process"""
+    
+    if not instrumentation.ENABLED:
+        return future.result()
+    lines, records = future.result()
+    instrumentation.merge(records)
+    return lines
+
+def score_corpus(hooks: Iterable[Tuple[Dict[str, Any], str]], target_length_seconds: int = 30,
+                 workers: Optional[int] = None, chunk_size: int = 2000,
+                 scores_only: bool = False,
+                 lexicons: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+    """Score a stream of hooks across worker processes.
+    
+    Yields one JSON line per hook in input order. Only a few chunks per
+    worker are in flight at once, so memory stays flat on large corpora.
+    """
+    
+    workers = workers or os.cpu_count() or 1
+    hooks = iter(hooks)
+    chunks = iter(lambda: _read_chunk(hooks, chunk_size), [])
+    
+    if workers == 1:
+        _init_worker(lexicons)
+        for chunk in chunks:
+            yield from _score_chunk(chunk, target_length_seconds, scores_only)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(lexicons,)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(_submit_chunk(pool, chunk, target_length_seconds, scores_only))
+            if len(pending) >= workers * 2:
+                yield from _chunk_result(pending.popleft())
+        
+        while pending:
+            yield from _chunk_result(pending.popleft())
+
+def positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1"""
+    
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value!r}")
+    return number
+
+def run_score(args: argparse.Namespace) -> None:
+    """Non-interactive corpus scoring for the `score` subcommand"""
+    
+    input_format = args.format
+    if input_format is None:
+        extension = os.path.splitext(args.input)[1].lower()
+        input_format = {'.csv': 'csv', '.txt': 'text'}.get(extension, 'jsonl')
+    
+    try:
+        lexicons = load_lexicons(args.lexicons) if args.lexicons else None
+    except (OSError, ValueError) as e:
+        print(f"Error loading lexicons: {e}", file=sys.stderr)
+        sys.exit(1)
+    
+    try:
+        source = sys.stdin if args.input == '-' else open(args.input, newline='', encoding='utf-8')
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    except OSError as e:
+        if source is not sys.stdin:
+            source.close()
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    
+    # Bad records are reported and skipped so one typo doesn't lose the rest of the corpus
+    rejected = []
+    
+    def report(number: int, message: str) -> None:
+        rejected.append(number)
+        print(f"Skipping line {number}: {message}", file=sys.stderr)
+    
+    try:
+        hooks = read_hooks(source, input_format, args.field, on_error=report)
+        for line in score_corpus(hooks, args.target_length, args.workers,
+                                 args.chunk_size, args.scores_only, lexicons):
+            output.write(line + '\n')
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+    
+    if rejected:
+        print(f"Skipped {len(rejected)} invalid record(s)", file=sys.stderr)
+        sys.exit(1)
+
 def main():
-    """Example usage"""
+    """Example usage, or corpus scoring via the `score` subcommand"""
+    parser = argparse.ArgumentParser(
+        description="Evaluate the effectiveness of video hooks",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s
+  %(prog)s score hooks.jsonl > scores.jsonl
+  %(prog)s score hooks.csv --field hook --workers 8 --scores-only
+  cat hooks.txt | %(prog)s score - --format text
+        """
+    )
+    subparsers = parser.add_subparsers(dest='command')
+    
+    score_parser = subparsers.add_parser('score', help="Score hooks from a file or stdin as JSONL")
+    score_parser.add_argument('input', nargs='?', default='-',
+                              help="JSONL, CSV or text file of hooks ('-' for stdin)")
+    score_parser.add_argument('--format', choices=['jsonl', 'csv', 'text'],
+                              help="Input format (default: from file extension, else jsonl)")
+    score_parser.add_argument('--field', help="Record field holding the hook (default: hook, then text)")
+    score_parser.add_argument('--output', '-o', default='-', help="Output JSONL path (default: stdout)")
+    score_parser.add_argument('--target-length', type=int, default=30,
+                              help="Target hook length in seconds (default: 30)")
+    score_parser.add_argument('--workers', type=positive_int, help="Worker processes (default: all cores)")
+    score_parser.add_argument('--chunk-size', type=positive_int, default=2000,
+                              help="Hooks per worker task (default: 2000)")
+    score_parser.add_argument('--scores-only', action='store_true',
+                              help="Output scores only, skipping strengths/weaknesses/suggestions")
+    score_parser.add_argument('--lexicons', help="JSON file overriding the analyzer lexicons")
+    
+    args = parser.parse_args()
+    
+    if args.command == 'score':
+        run_score(args)
+        return
+    
     analyzer = HookAnalyzer()
     
     print("🎬 YouTube Hook Analyzer")
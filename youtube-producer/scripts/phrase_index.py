@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Phrase Index
+Finds every occurrence of a fixed set of phrases in a single scan
+"""
+
+import re
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+
+class PhraseIndex:
+    """Multi-phrase matcher compiled once and reused for every scan.
+
+    The phrases are folded into a trie and emitted as one regex that returns
+    the longest phrase at the leftmost matching position. Overlapping hits
+    are recovered from two tables built up front: the phrases contained in
+    each phrase, and the phrases whose tail could start another phrase (only
+    those force the scan to resume inside the previous match).
+    """
+
+    def __init__(self, phrases: Iterable[str]):
+        self.phrases = list(dict.fromkeys(p for p in phrases if p))
+        trie = self._build_trie(self.phrases)
+        self._pattern = re.compile(self._trie_to_regex(trie)) if self.phrases else None
+
+        phrase_set = set(self.phrases)
+        prefixes = {phrase[:i] for phrase in self.phrases for i in range(1, len(phrase))}
+
+        # (offset, phrase) for every other phrase found inside each phrase
+        self._contained: Dict[str, Tuple[Tuple[int, str], ...]] = {}
+        # Phrases with a proper suffix that begins some phrase
+        self._overlapping: Set[str] = set()
+
+        for phrase in self.phrases:
+            self._contained[phrase] = tuple(
+                (start, phrase[start:end])
+                for start in range(len(phrase))
+                for end in range(start + 1, len(phrase) + 1)
+                if (start, end) != (0, len(phrase)) and phrase[start:end] in phrase_set
+            )
+            if any(phrase[i:] in prefixes for i in range(1, len(phrase))):
+                self._overlapping.add(phrase)
+
+    @staticmethod
+    def _build_trie(phrases: List[str]) -> Dict:
+        trie: Dict = {}
+        for phrase in phrases:
+            node = trie
+            for char in phrase:
+                node = node.setdefault(char, {})
+            node[''] = True
+        return trie
+
+    @classmethod
+    def _trie_to_regex(cls, node: Dict) -> str:
+        """Emit a trie node as a regex that prefers the longest match"""
+
+        terminal = '' in node
+        branches = [re.escape(char) + cls._trie_to_regex(child)
+                    for char, child in sorted(node.items()) if char]
+
+        if not branches:
+            return ''
+
+        if len(branches) > 1:
+            group = f"(?:{'|'.join(branches)})"
+        elif terminal:
+            group = f"(?:{branches[0]})"
+        else:
+            group = branches[0]
+
+        # Greedy '?' tries the longer branches before stopping at this node
+        return f"{group}?" if terminal else group
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, str]]:
+        """Yield (start, phrase) for every occurrence of every phrase.
+
+        Occurrences are grouped by the leftmost-longest match that exposed
+        them, so starts are non-decreasing only within each group.
+        """
+
+        if self._pattern is None:
+            return
+
+        search = self._pattern.search
+        match = search(text)
+        while match:
+            start = match.start()
+            phrase = match.group()
+            yield start, phrase
+
+            if phrase in self._overlapping:
+                # Rescan from the next character; only same-start prefixes
+                # would otherwise be skipped
+                for offset, inner in self._contained[phrase]:
+                    if offset == 0:
+                        yield start, inner
+                match = search(text, start + 1)
+            else:
+                for offset, inner in self._contained[phrase]:
+                    yield start + offset, inner
+                match = search(text, match.end())
+
+    def found(self, text: str) -> Set[str]:
+        """Return the distinct phrases that occur anywhere in the text"""
+
+        hits: Set[str] = set()
+        if self._pattern is None:
+            return hits
+
+        search = self._pattern.search
+        match = search(text)
+        while match:
+            phrase = match.group()
+            hits.add(phrase)
+            hits.update(inner for _, inner in self._contained[phrase])
+            if phrase in self._overlapping:
+                match = search(text, match.start() + 1)
+            else:
+                match = search(text, match.end())
+        return hits
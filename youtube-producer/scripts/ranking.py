@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Ranking
+Top-k selection over score arrays, shared by the hook and title analyzers
+"""
+
+import heapq
+from typing import List
+
+try:
+    import numpy as np
+except ImportError:  # Falls back to a heap over plain lists
+    np = None
+
+
+def top_indices(scores, top_k: int) -> List[int]:
+    """Indices of the top_k scores, best first, ties in input order
+
+    scores is a NumPy array when NumPy is installed, otherwise a list.
+    """
+
+    count = len(scores)
+    top_k = max(0, min(top_k, count))
+    if top_k == 0:
+        return []
+
+    if np is None:
+        return heapq.nsmallest(top_k, range(count), key=lambda i: (-scores[i], i))
+
+    if top_k < count:
+        # Everything above the k-th best score, then ties in input order
+        cutoff = scores[np.argpartition(-scores, top_k - 1)[top_k - 1]]
+        above = np.flatnonzero(scores > cutoff)
+        ties = np.flatnonzero(scores == cutoff)[:top_k - len(above)]
+        candidates = np.concatenate([above, ties])
+    else:
+        candidates = np.arange(count)
+
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order].tolist()
@@ -4,11 +4,27 @@ YouTube Shorts Extractor
 Identifies short-worthy moments from video outlines
 """
 
+import argparse
+import glob
+import heapq
+import os
 import re
-from typing import List, Dict, Tuple
-from dataclasses import dataclass
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, List, Dict, Iterable, Iterator, Optional, Tuple
+from dataclasses import asdict, dataclass
 import json
 
+import instrumentation
+from instrumentation import count, timed
+from phrase_index import PhraseIndex
+
+SECTION_HEADER = re.compile(r'^(#{1,3}|Act \d|Part \d|\d+\.)')
+OUTLINE_EXTENSIONS = ('.md', '.markdown', '.txt')
+MONEY_PATTERN = re.compile(r'\$\d+')
+STATISTIC_PATTERN = re.compile(r'\d+%')
+
 @dataclass
 class ShortConcept:
     """A potential YouTube Short concept"""
@@ -84,74 +100,109 @@ class ShortsExtractor:
             'behind_scenes': ['blooper', 'behind the scenes', 'what went wrong',
                              'failed attempt']
         }
+        
+        self.build_trigger_index()
     
-    def extract_shorts(self, video_outline: str) -> List[ShortConcept]:
-        """Extract potential shorts from a video outline"""
+    def build_trigger_index(self) -> None:
+        """Compile every trigger phrase into one index.
         
-        shorts = []
-        sections = self._parse_outline(video_outline)
+        Call again after editing trigger_phrases.
+        """
+        
+        # phrase -> [(short_type, rank within that type's list)]
+        self._phrase_types: Dict[str, List[Tuple[str, int]]] = {}
+        for short_type, phrases in self.trigger_phrases.items():
+            for rank, phrase in enumerate(phrases):
+                self._phrase_types.setdefault(phrase.lower(), []).append((short_type, rank))
+        
+        self._trigger_index = PhraseIndex(self._phrase_types)
+    
+    def find_triggers(self, content: str) -> Dict[str, List[Tuple[int, str]]]:
+        """Map each short type to its (offset, phrase) trigger hits, in text order"""
         
-        for section_title, section_content in sections.items():
-            # Check each section for short-worthy content
-            potential_shorts = self._analyze_section(section_title, section_content)
-            shorts.extend(potential_shorts)
+        hits: Dict[str, List[Tuple[int, str]]] = {}
+        for start, phrase in self._trigger_index.finditer(content.lower()):
+            for short_type, _ in self._phrase_types[phrase]:
+                hits.setdefault(short_type, []).append((start, phrase))
+        
+        for type_hits in hits.values():
+            type_hits.sort()
+        return hits
+    
+    def extract_shorts(self, video_outline: str, limit: int = 5) -> List[ShortConcept]:
+        """Extract potential shorts from a video outline"""
         
-        # Sort by viral potential
-        shorts.sort(key=lambda x: x.viral_potential, reverse=True)
+        return self.extract_shorts_stream(_iter_lines(video_outline), limit)
+    
+    @timed('shorts.extract')
+    def extract_shorts_stream(self, lines: Iterable[str], limit: int = 5) -> List[ShortConcept]:
+        """Extract potential shorts from any line iterator or open file.
+        
+        Sections are analyzed as soon as their header closes and only the
+        best `limit` concepts are kept, so memory is bounded by the largest
+        section rather than the whole outline.
+        """
+        
+        candidates = (
+            short
+            for section_title, section_content in self.iter_sections(lines)
+            for short in self._analyze_section(section_title, section_content)
+        )
         
-        # Limit to top 5 concepts
-        return shorts[:5]
+        # Top concepts by viral potential; ties keep outline order
+        return heapq.nsmallest(limit, candidates, key=lambda x: -x.viral_potential)
     
-    def _parse_outline(self, outline: str) -> Dict[str, str]:
-        """Parse outline into sections"""
+    def iter_sections(self, lines: Iterable[str]) -> Iterator[Tuple[str, str]]:
+        """Yield (title, content) for each non-empty section as it closes"""
         
-        sections = {}
         current_section = "Introduction"
         current_content = []
         
-        lines = outline.split('\n')
-        
         for line in lines:
             # Check if this is a section header
-            if re.match(r'^(#{1,3}|Act \d|Part \d|\d+\.)', line):
+            if SECTION_HEADER.match(line):
                 if current_content:
-                    sections[current_section] = '\n'.join(current_content)
+                    yield current_section, '\n'.join(current_content)
                 current_section = line.strip('#').strip()
                 current_content = []
             else:
-                if line.strip():
-                    current_content.append(line.strip())
+                line = line.strip()
+                if line:
+                    current_content.append(line)
         
         # Add the last section
         if current_content:
-            sections[current_section] = '\n'.join(current_content)
-        
-        return sections
+            yield current_section, '\n'.join(current_content)
     
+    @timed('shorts.analyze_section')
     def _analyze_section(self, title: str, content: str) -> List[ShortConcept]:
         """Analyze a section for short potential"""
         
         shorts = []
-        lower_content = content.lower()
         
-        # Check for trigger phrases
-        for short_type, phrases in self.trigger_phrases.items():
-            for phrase in phrases:
-                if phrase in lower_content:
-                    short = self._create_short_concept(
-                        short_type, title, content, phrase
-                    )
-                    if short:
-                        shorts.append(short)
-                    break  # Only one short per type per section
+        # Earliest-listed trigger phrase found for each type
+        first_triggers: Dict[str, Tuple[int, str]] = {}
+        for phrase in self._trigger_index.found(content.lower()):
+            for short_type, rank in self._phrase_types[phrase]:
+                if short_type not in first_triggers or rank < first_triggers[short_type][0]:
+                    first_triggers[short_type] = (rank, phrase)
+        
+        # Only one short per type per section
+        for short_type in self.trigger_phrases:
+            if short_type in first_triggers:
+                short = self._create_short_concept(
+                    short_type, title, content, first_triggers[short_type][1]
+                )
+                if short:
+                    shorts.append(short)
         
         # Special checks for high-value content
-        if re.search(r'\$\d+', content):  # Money mentioned
+        if MONEY_PATTERN.search(content):  # Money mentioned
             short = self._create_short_concept('reveal', title, content, 'money')
             if short:
                 shorts.append(short)
         
-        if re.search(r'\d+%', content):  # Statistics mentioned
+        if STATISTIC_PATTERN.search(content):  # Statistics mentioned
             short = self._create_short_concept('myth', title, content, 'statistic')
             if short:
                 shorts.append(short)
@@ -288,6 +339,18 @@ class ShortsExtractor:
         
         return '\n'.join(script)
 
+def _iter_lines(text: str) -> Iterator[str]:
+    """Yield the lines of a string without building a list of them"""
+    
+    start = 0
+    while True:
+        end = text.find('\n', start)
+        if end < 0:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
 def format_short_concept(short: ShortConcept) -> str:
     """Format a short concept for display"""
     
@@ -305,8 +368,141 @@ def format_short_concept(short: ShortConcept) -> str:
     
     return '\n'.join(output)
 
+def find_outline_files(paths: Iterable[str]) -> List[str]:
+    """Expand files, directories and glob patterns into a sorted file list"""
+    
+    files = set()
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.update(os.path.join(root, name) for name in names
+                             if name.lower().endswith(OUTLINE_EXTENSIONS))
+        elif glob.has_magic(path):
+            files.update(p for p in glob.glob(path, recursive=True) if os.path.isfile(p))
+        else:
+            files.add(path)
+    
+    return sorted(files)
+
+_worker_extractor: Optional['ShortsExtractor'] = None
+
+def _init_worker() -> None:
+    """Build the one ShortsExtractor each worker process reuses"""
+    
+    global _worker_extractor
+    _worker_extractor = ShortsExtractor()
+
+@timed('shorts.mine_file')
+def _mine_file(path: str, limit: int) -> Dict[str, Any]:
+    """Extract ranked shorts from one outline file in a worker"""
+    
+    try:
+        size = os.path.getsize(path)
+        with open(path, encoding='utf-8', errors='replace') as f:
+            shorts = _worker_extractor.extract_shorts_stream(f, limit)
+    except OSError as e:
+        return {'file': path, 'bytes': 0, 'error': str(e)}
+    
+    count('shorts.bytes_mined', size)
+    return {'file': path, 'bytes': size, 'shorts': [asdict(short) for short in shorts]}
+
+def mine_files(paths: List[str], limit: int = 5, workers: Optional[int] = None,
+               chunk_size: int = 4) -> Iterator[Dict[str, Any]]:
+    """Extract shorts from many outline files across worker processes.
+    
+    Yields one result per file, in the order given.
+    """
+    
+    workers = workers or os.cpu_count() or 1
+    
+    if workers == 1:
+        _init_worker()
+        for path in paths:
+            yield _mine_file(path, limit)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        if not instrumentation.ENABLED:
+            yield from pool.map(_mine_file, paths, [limit] * len(paths), chunksize=chunk_size)
+            return
+        
+        # Bring each worker's timings back with its result
+        for result, records in pool.map(instrumentation.run_recorded, [_mine_file] * len(paths),
+                                        paths, [limit] * len(paths), chunksize=chunk_size):
+            instrumentation.merge(records)
+            yield result
+
+def format_throughput(done: int, total: int, total_bytes: int, elapsed: float) -> str:
+    """Format mining progress with files/s and MB/s"""
+    
+    elapsed = max(elapsed, 1e-9)
+    return (f"[{done}/{total}] {done / elapsed:.1f} files/s, "
+            f"{total_bytes / elapsed / 1_000_000:.2f} MB/s")
+
+def run_mine(args: argparse.Namespace) -> None:
+    """Batch shorts mining for the `mine` subcommand"""
+    
+    paths = find_outline_files(args.paths)
+    if not paths:
+        print("Error: No outline files found", file=sys.stderr)
+        sys.exit(1)
+    
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    interactive = sys.stderr.isatty() and not args.quiet
+    start = time.perf_counter()
+    total_bytes = 0
+    failures = 0
+    
+    try:
+        for done, result in enumerate(mine_files(paths, args.limit, args.workers), 1):
+            total_bytes += result['bytes']
+            failures += 'error' in result
+            output.write(json.dumps(result, ensure_ascii=False) + '\n')
+            
+            if interactive:
+                progress = format_throughput(done, len(paths), total_bytes,
+                                             time.perf_counter() - start)
+                print(f"\r{progress}", end='', file=sys.stderr, flush=True)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    
+    if not args.quiet:
+        summary = format_throughput(len(paths), len(paths), total_bytes,
+                                    time.perf_counter() - start)
+        print(f"\r{summary}, {failures} failed", file=sys.stderr)
+    
+    if failures:
+        sys.exit(1)
+
 def main():
-    """Example usage"""
+    """Example usage, or batch mining via the `mine` subcommand"""
+    parser = argparse.ArgumentParser(
+        description="Identify short-worthy moments from video outlines",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s
+  %(prog)s mine transcripts/ --output shorts.jsonl
+  %(prog)s mine 'outlines/**/*.md' --workers 8 --limit 10
+        """
+    )
+    subparsers = parser.add_subparsers(dest='command')
+    
+    mine_parser = subparsers.add_parser('mine', help="Extract shorts from many outline files as JSONL")
+    mine_parser.add_argument('paths', nargs='+',
+                             help="Outline files, directories or glob patterns")
+    mine_parser.add_argument('--output', '-o', default='-', help="Output JSONL path (default: stdout)")
+    mine_parser.add_argument('--limit', type=int, default=5, help="Shorts to keep per file (default: 5)")
+    mine_parser.add_argument('--workers', type=int, help="Worker processes (default: all cores)")
+    mine_parser.add_argument('--quiet', '-q', action='store_true', help="Hide progress and summary")
+    
+    args = parser.parse_args()
+    
+    if args.command == 'mine':
+        run_mine(args)
+        return
+    
     extractor = ShortsExtractor()
     
     print("🎬 YouTube Shorts Extractor")
@@ -6,7 +6,28 @@ Generates viral title options based on topic and style
 
 import random
 import re
-from typing import List, Dict
+from dataclasses import dataclass
+from itertools import islice, product
+from typing import List, Dict, Iterator, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Bulk scoring falls back to pure Python
+    np = None
+
+from instrumentation import timed
+from phrase_index import PhraseIndex
+from ranking import top_indices
+
+PLACEHOLDER = re.compile(r'\{(\w+)\}')
+DIGIT = re.compile(r'\d')
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """A title template parsed once into a format pattern and its placeholders"""
+    source: str
+    pattern: str
+    fields: Tuple[str, ...]
 
 class TitleGenerator:
     def __init__(self):
@@ -56,138 +77,297 @@ class TitleGenerator:
                 "Why I Quit {thing} After {achievement}"
             ]
         }
-    
-    def generate_titles(self, topic: str, style: str = None, count: int = 5) -> List[str]:
-        """Generate title options for a given topic and style"""
         
-        if style and style in self.templates:
-            templates = self.templates[style]
-        else:
-            # Use all templates if no style specified
-            templates = []
-            for template_list in self.templates.values():
-                templates.extend(template_list)
-        
-        titles = []
-        used_templates = []
-        
-        for _ in range(count):
-            available_templates = [t for t in templates if t not in used_templates]
-            if not available_templates:
-                available_templates = templates
-                used_templates = []
-            
-            template = random.choice(available_templates)
-            used_templates.append(template)
-            
-            title = self._fill_template(template, topic)
-            titles.append(title)
-        
-        return titles
-    
-    def _fill_template(self, template: str, topic: str) -> str:
-        """Fill in template variables with contextual content"""
+        # Placeholders filled with a random pick on each title
+        self.placeholder_choices = {
+            'number': ['3', '5', '7', '10', '15', '21', '30'],
+            'time_period': ['24 Hours', '7 Days', '30 Days', '1 Year'],
+            'amount': ['100', '500', '1000', '5000', '10000', '50000', '100000'],
+            'price1': ['1', '10', '100'],
+            'price2': ['1000', '10000', '100000', '1000000'],
+            'max_level': ['5', '10', '100'],
+            'authority': ['Experts', 'Big Tech', 'The Industry']
+        }
         
-        replacements = {
-            'topic': topic,
-            'number': str(random.choice([3, 5, 7, 10, 15, 21, 30])),
-            'time_period': random.choice(['24 Hours', '7 Days', '30 Days', '1 Year']),
-            'amount': str(random.choice([100, 500, 1000, 5000, 10000, 50000, 100000])),
-            'price1': str(random.choice([1, 10, 100])),
-            'price2': str(random.choice([1000, 10000, 100000, 1000000])),
-            'max_level': str(random.choice([5, 10, 100])),
-            
-            # Context-aware replacements
-            'unexpected_result': f"the Best {topic} Strategy",
-            'phenomenon': f"Everyone's Obsessed with {topic}",
-            'secret': f"Secret",
-            'subject': topic,
-            'controversial_topic': topic,
-            'authority': random.choice(['Experts', 'Big Tech', 'The Industry']),
-            'task': f"Master {topic} in 1 Day",
-            'action': f"Studied {topic}",
+        # Context-aware placeholders; {topic} is replaced with the topic
+        self.placeholder_text = {
+            'topic': "{topic}",
+            'unexpected_result': "the Best {topic} Strategy",
+            'phenomenon': "Everyone's Obsessed with {topic}",
+            'secret': "Secret",
+            'subject': "{topic}",
+            'controversial_topic': "{topic}",
+            'task': "Master {topic} in 1 Day",
+            'action': "Studied {topic}",
             'result': "These Were the Results",
-            'desired_outcome': f"Master {topic}",
-            'achieve_goal': f"Improve Your {topic} Skills",
-            'skill': topic,
-            'mistake': f"Making These {topic} Mistakes",
+            'desired_outcome': "Master {topic}",
+            'achieve_goal': "Improve Your {topic} Skills",
+            'skill': "{topic}",
+            'mistake': "Making These {topic} Mistakes",
             'bad_state': "Complete Beginner",
             'good_state': "Expert Level",
-            'method': f"{topic} Technique",
+            'method': "{topic} Technique",
             'aspect': "Life",
             'start': "Zero",
             'end': "Hero",
             'achievement': "10,000 Hours",
-            'type': topic,
-            'item': topic,
-            'items': f"{topic} Tools",
-            'option1': f"Traditional {topic}",
-            'option2': f"Modern {topic}",
-            'expensive_option': f"Premium {topic}",
+            'type': "{topic}",
+            'item': "{topic}",
+            'items': "{topic} Tools",
+            'option1': "Traditional {topic}",
+            'option2': "Modern {topic}",
+            'expensive_option': "Premium {topic}",
             'old_way': "The Old Method",
             'new_way': "This New Technique",
-            'extreme_action': f"Lived Like a {topic} Expert",
-            'limitation': f"You Can't Learn {topic} Fast",
+            'extreme_action': "Lived Like a {topic} Expert",
+            'limitation': "You Can't Learn {topic} Fast",
             'proved_wrong': "Proved Them Wrong",
-            'thing': topic,
-            'challenge': f"Beat My {topic} Score"
+            'thing': "{topic}",
+            'challenge': "Beat My {topic} Score"
         }
         
-        # Replace all placeholders
-        for key, value in replacements.items():
-            pattern = r'\{' + key + r'\}'
-            if re.search(pattern, template):
-                template = re.sub(pattern, value, template)
+        self._compiled_templates: Dict[str, CompiledTemplate] = {}
         
-        return template
+        self.power_words = [
+            'secret', 'shocking', 'truth', 'actually', 'nobody',
+            'impossible', 'changed', 'mistake', 'quit', 'master'
+        ]
+        
+        self.compile_lexicons()
     
-    def generate_with_metrics(self, topic: str, style: str = None) -> List[Dict]:
-        """Generate titles with predicted performance metrics"""
+    def compile_lexicons(self) -> None:
+        """Precompile the power words into a single-pass matcher.
         
-        titles = self.generate_titles(topic, style, count=10)
-        results = []
+        Call again after editing power_words. Templates need no call: they
+        are compiled on first use and cached by their text.
+        """
         
-        for title in titles:
-            # Simple heuristic scoring
-            score = 0
-            
-            # Length scoring (optimal 40-60 chars)
-            length = len(title)
-            if 40 <= length <= 60:
-                score += 20
-            elif 30 <= length <= 70:
-                score += 10
-            
-            # Power word scoring
-            power_words = ['secret', 'shocking', 'truth', 'actually', 'nobody', 
-                          'impossible', 'changed', 'mistake', 'quit', 'master']
-            for word in power_words:
-                if word.lower() in title.lower():
-                    score += 10
-            
-            # Number inclusion
-            if any(char.isdigit() for char in title):
-                score += 15
-            
-            # Question format
-            if '?' in title:
-                score += 10
+        self._power_index = PhraseIndex(word.lower() for word in self.power_words)
+    
+    @timed('titles.generate')
+    def generate_titles(self, topic: str, style: str = None, count: int = 5,
+                        seed: Optional[int] = None,
+                        rng: Optional[random.Random] = None) -> List[str]:
+        """Generate title options for a given topic and style.
+        
+        Templates are used without replacement until every one has been
+        used once. Pass a seed or random.Random to make the result
+        reproducible.
+        """
+        
+        rng = rng if rng is not None else random.Random(seed)
+        templates = self._style_templates(style)
+        
+        return [self._fill_template(template, topic, rng)
+                for template in islice(self._sample_templates(templates, rng), count)]
+    
+    def iter_titles(self, topic: str, style: str = None, seed: Optional[int] = None,
+                    rng: Optional[random.Random] = None, patience: int = 50,
+                    count: Optional[int] = None) -> Iterator[str]:
+        """A lazy stream of unique titles for a topic.
+        
+        The templates and placeholder choices allow a fixed number of
+        distinct titles (see count_titles), so the stream ends after
+        exactly that many, or after `count` if given. Titles are sampled
+        at random until `patience` full passes over the templates produce
+        no new title; the ones sampling missed then follow in shuffled
+        order. The stream is replayable for a given seed.
+        
+        Raises:
+            ValueError: at once, if `count` asks for more titles than exist
+        """
+        
+        if count is not None:
+            available = self.count_titles(topic, style)
+            if count > available:
+                raise ValueError(f"Only {available} unique titles exist for this topic and style; "
+                                 f"asked for {count}")
+        
+        rng = rng if rng is not None else random.Random(seed)
+        return islice(self._unique_titles(topic, self._style_templates(style), rng, patience), count)
+    
+    def _unique_titles(self, topic: str, templates: List[str], rng: random.Random,
+                       patience: int) -> Iterator[str]:
+        """Sampled unique titles, then whatever sampling missed"""
+        
+        seen = set()
+        stale_rounds = 0
+        
+        while stale_rounds < patience:
+            stale_rounds += 1
+            for template in self._shuffled(templates, rng):
+                title = self._fill_template(template, topic, rng)
+                if title not in seen:
+                    seen.add(title)
+                    stale_rounds = 0
+                    yield title
+        
+        missed = [title for title in self._all_titles(topic, templates) if title not in seen]
+        yield from self._shuffled(missed, rng)
+    
+    def count_titles(self, topic: str, style: str = None) -> int:
+        """How many distinct titles the templates can produce for a topic and style"""
+        
+        return len(self._all_titles(topic, self._style_templates(style)))
+    
+    def _all_titles(self, topic: str, templates: List[str]) -> List[str]:
+        """Every distinct title the templates can produce, in template order"""
+        
+        titles = {}
+        for template in templates:
+            compiled = self._compiled(template)
+            options = [self.placeholder_choices[field] if field in self.placeholder_choices
+                       else [self._fill_placeholder(field, topic, None)]
+                       for field in compiled.fields]
+            for values in product(*options):
+                titles.setdefault(compiled.pattern.format_map(dict(zip(compiled.fields, values))), None)
+        return list(titles)
+    
+    def _style_templates(self, style: Optional[str]) -> List[str]:
+        """Templates for a style, or all templates if no known style is given"""
+        
+        if style and style in self.templates:
+            return self.templates[style]
+        
+        templates = []
+        for template_list in self.templates.values():
+            templates.extend(template_list)
+        return templates
+    
+    @staticmethod
+    def _shuffled(templates: List[str], rng: random.Random) -> List[str]:
+        """One pass over the templates in random order"""
+        
+        order = list(templates)
+        rng.shuffle(order)
+        return order
+    
+    def _sample_templates(self, templates: List[str], rng: random.Random) -> Iterator[str]:
+        """Endless template sequence, without replacement within each pass"""
+        
+        while templates:
+            yield from self._shuffled(templates, rng)
+    
+    @timed('titles.fill_template')
+    def _fill_template(self, template: str, topic: str, rng=random) -> str:
+        """Fill in template variables with contextual content"""
+        
+        compiled = self._compiled(template)
+        
+        # Only the placeholders this template uses are evaluated
+        values = {field: self._fill_placeholder(field, topic, rng) for field in compiled.fields}
+        return compiled.pattern.format_map(values)
+    
+    def _compiled(self, template: str) -> CompiledTemplate:
+        """A template's compiled form, compiled on first use"""
+        
+        compiled = self._compiled_templates.get(template)
+        if compiled is None:
+            compiled = self._compiled_templates[template] = self.compile_template(template)
+        return compiled
+    
+    def compile_template(self, template: str) -> CompiledTemplate:
+        """Split a template into literal text and known placeholder slots"""
+        
+        pattern = []
+        fields = []
+        position = 0
+        
+        for match in PLACEHOLDER.finditer(template):
+            field = match.group(1)
+            literal = template[position:match.start()]
+            pattern.append(literal.replace('{', '{{').replace('}', '}}'))
             
-            # Dollar amount
-            if '$' in title:
-                score += 15
+            if field in self.placeholder_choices or field in self.placeholder_text:
+                pattern.append('{' + field + '}')
+                if field not in fields:
+                    fields.append(field)
+            else:
+                # Unknown placeholders are left in the title as-is
+                pattern.append('{{' + field + '}}')
             
-            results.append({
-                'title': title,
-                'length': length,
-                'score': min(score, 100),
+            position = match.end()
+        
+        literal = template[position:]
+        pattern.append(literal.replace('{', '{{').replace('}', '}}'))
+        
+        return CompiledTemplate(source=template, pattern=''.join(pattern), fields=tuple(fields))
+    
+    def _fill_placeholder(self, field: str, topic: str, rng) -> str:
+        """Resolve a single placeholder for the given topic"""
+        
+        choices = self.placeholder_choices.get(field)
+        if choices is not None:
+            return rng.choice(choices)
+        return self.placeholder_text[field].replace('{topic}', topic)
+    
+    def generate_with_metrics(self, topic: str, style: str = None,
+                              seed: Optional[int] = None, count: int = 10) -> List[Dict]:
+        """Generate titles with predicted performance metrics"""
+        
+        titles = self.generate_titles(topic, style, count=count, seed=seed)
+        return self.score_titles(titles, style)
+    
+    def score_titles(self, titles: Sequence[str], style: str = None,
+                     top_k: Optional[int] = None) -> List[Dict]:
+        """Score any number of titles in bulk, best first.
+        
+        Only the top_k results (all if None) are sorted and turned into
+        dicts; ties keep their input order.
+        """
+        
+        scores, lengths = self._bulk_scores(titles)
+        top_k = len(titles) if top_k is None else top_k
+        
+        return [
+            {
+                'title': titles[i],
+                'length': int(lengths[i]),
+                'score': int(scores[i]),
                 'style': style or 'mixed'
-            })
+            }
+            for i in top_indices(scores, top_k)
+        ]
+    
+    def title_features(self, titles: Sequence[str]) -> Dict[str, object]:
+        """Length, power-word count and digit/question/dollar flags as columns"""
+        
+        count_power = self._power_index.found
+        features = {
+            'length': [len(title) for title in titles],
+            'power': [len(count_power(title.lower())) for title in titles],
+            'digit': [DIGIT.search(title) is not None for title in titles],
+            'question': ['?' in title for title in titles],
+            'dollar': ['$' in title for title in titles]
+        }
+        
+        if np is not None:
+            features = {name: np.array(column, dtype=np.int32) for name, column in features.items()}
+        return features
+    
+    @staticmethod
+    def _score_features(length, power, digit, question, dollar):
+        """Heuristic title score for scalars or whole NumPy columns"""
+        
+        # Length scoring (optimal 40-60 chars, acceptable 30-70)
+        in_range = (length >= 30) & (length <= 70)
+        optimal = (length >= 40) & (length <= 60)
+        
+        return (10 * in_range + 10 * optimal + 10 * power
+                + 15 * digit + 10 * question + 15 * dollar)
+    
+    @timed('titles.score')
+    def _bulk_scores(self, titles: Sequence[str]):
+        """Capped scores and lengths for every title"""
+        
+        features = self.title_features(titles)
         
-        # Sort by score
-        results.sort(key=lambda x: x['score'], reverse=True)
+        if np is None:
+            scores = [min(int(self._score_features(*row)), 100)
+                      for row in zip(*features.values())]
+            return scores, features['length']
         
-        return results
+        return np.minimum(self._score_features(**features), 100), features['length']
 
 def main():
     """Example usage"""